@@ -6,6 +6,8 @@ This file demonstrates various ways to use the system.
 
 import sys
 import os
+import logging
+import numpy as np
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), 'src'))
 
 from data.generate_dataset import SyntheticGeneDataGenerator
@@ -41,15 +43,20 @@ def example_2_individual_agents():
     print("EXAMPLE 2: Individual Agent Analysis")
     print("="*70)
     
-    # Sample sequences
-    reference = "ATGCATGCATGCATGC" * 10  # 160 base pairs
-    sample = "ATGCATGGATGCATGC" * 10     # With one mutation per repeat
+    # Sample sequences, built directly as uint8 arrays
+    reference_u8 = np.tile(np.frombuffer(b"ATGCATGCATGCATGC", dtype=np.uint8), 10)  # 160 base pairs
+    sample_u8 = np.tile(np.frombuffer(b"ATGCATGGATGCATGC", dtype=np.uint8), 10)     # With one mutation per repeat
+    reference = reference_u8.tobytes().decode('ascii')
+    sample = sample_u8.tobytes().decode('ascii')
     
+    # Agents reuse the '_<key>_u8' arrays instead of re-encoding the strings
     patient_data = {
         'patient_id': 'EXAMPLE_001',
         'gene_type': 'BRCA1',
         'reference': reference,
-        'sample': sample
+        'sample': sample,
+        '_reference_u8': reference_u8,
+        '_sample_u8': sample_u8
     }
     
     # Test Alignment Agent
@@ -70,7 +77,7 @@ def example_2_individual_agents():
     # Test Pattern Agent
     print("\n[Pattern Recognition Agent]")
     pattern_agent = PatternRecognitionAgent()
-    pattern_data = {'patient_id': 'EXAMPLE_001', 'sequence': sample}
+    pattern_data = {'patient_id': 'EXAMPLE_001', 'sequence': sample, '_sequence_u8': sample_u8}
     pattern_result = pattern_agent.analyze(pattern_data)
     print(f"  Complexity Score: {pattern_result['complexity_score']:.3f}")
     print(f"  Known Motifs: {len(pattern_result['known_motifs'])}")
@@ -90,11 +97,11 @@ def example_3_full_orchestration():
         sequence_length=500,
         with_mutations=True
     )
-    dataset_path = '/tmp/example_dataset.csv'
+    dataset_path = '/tmp/example_dataset.parquet'
     generator.save_dataset(dataset, dataset_path)
     
     # Run orchestration
-    orchestrator = GeneSequencingOrchestrator()
+    orchestrator = GeneSequencingOrchestrator(verbose=True)
     results = orchestrator.analyze_dataset(dataset_path, max_samples=3)
     
     # Generate report
@@ -160,6 +167,8 @@ def example_4_custom_analysis():
 
 def main():
     """Run all examples."""
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+    
     print("\n" + "="*70)
     print("GENE SEQUENCING AGENTIC AI - USAGE EXAMPLES")
     print("="*70)
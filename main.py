@@ -4,12 +4,16 @@ Gene Sequencing Analysis using Agentic AI
 Main entry point for the gene sequencing analysis system.
 """
 
+import logging
+import sys
+
 from src.data.generate_dataset import SyntheticGeneDataGenerator
 from src.orchestrator import GeneSequencingOrchestrator
 
 
 def main():
     """Main function to run the gene sequencing analysis."""
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
     
     print("="*70)
     print(" GENE SEQUENCING ANALYSIS USING AGENTIC AI")
@@ -25,13 +29,13 @@ def main():
         with_mutations=True
     )
     
-    dataset_path = 'src/data/synthetic_gene_sequences.csv'
+    dataset_path = 'src/data/synthetic_gene_sequences.parquet'
     generator.save_dataset(dataset, dataset_path)
     
     # Step 2: Run Agentic AI Analysis
     print("\n[STEP 2] Running Agentic AI Analysis...")
     print("-" * 70)
-    orchestrator = GeneSequencingOrchestrator()
+    orchestrator = GeneSequencingOrchestrator(verbose=True)
     
     # Analyze first 10 patients for demonstration
     results = orchestrator.analyze_dataset(dataset_path, max_samples=10)
@@ -1,8 +1,9 @@
 """
 Sequence Alignment Agent for comparing and aligning gene sequences.
 """
-import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Tuple, Optional, NamedTuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache, partial
 import numpy as np
 import sys
 import os
@@ -10,17 +11,174 @@ import os
 # Handle imports for both package and standalone execution
 try:
     from .base_agent import BaseAgent
-    from ..utils.sequence_utils import hamming_distance, calculate_gc_content
+    from ..utils.sequence_utils import (hamming_distance, calculate_gc_content, encode_sequence,
+                                        BatchMismatches, _GC_LUT)
 except ImportError:
     # Fallback for standalone or test execution
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from base_agent import BaseAgent
-    from utils.sequence_utils import hamming_distance, calculate_gc_content
+    from utils.sequence_utils import (hamming_distance, calculate_gc_content, encode_sequence,
+                                      BatchMismatches, _GC_LUT)
+
+# Optional dependency: SIMD striped semi-global alignment for unequal-length pairs
+try:
+    import parasail
+except ImportError:
+    parasail = None
+
+
+def _scan(seq1: np.ndarray, seq2: np.ndarray) -> Tuple[int, Tuple[int, ...], int]:
+    """
+    Compare two sequences in a single pass.
+    
+    Args:
+        seq1: First sequence as a uint8 array
+        seq2: Second sequence as a uint8 array
+        
+    Returns:
+        Tuple of (match count, mismatch positions, gap count)
+    """
+    min_len = min(len(seq1), len(seq2))
+    mismatch_positions = np.flatnonzero(seq1[:min_len] != seq2[:min_len])
+    matches = min_len - len(mismatch_positions)
+    
+    # Count gaps as length difference
+    gaps = abs(len(seq1) - len(seq2))
+    
+    return matches, tuple(mismatch_positions.tolist()), gaps
+
+
+def _scan_aligned(reference: str, sample: str) -> Tuple[int, Tuple[int, ...], int]:
+    """
+    Compare two sequences of different lengths via semi-global alignment.
+    
+    Uses parasail's striped (Farrar) semi-global alignment with the NUC.4.4
+    matrix, gap open 10 and gap extend 1, and reads the counts off the CIGAR
+    string. End gaps are free in the score but still appear in the CIGAR, so
+    overhangs count as gaps whichever end of either sequence they are on.
+    
+    Args:
+        reference: Reference sequence
+        sample: Sample sequence
+        
+    Returns:
+        Tuple of (match count, mismatch positions in the reference, gap count)
+    """
+    cigar = parasail.sg_trace_striped_16(reference, sample, 10, 1, parasail.nuc44).cigar
+    
+    matches = 0
+    mismatches = []
+    gaps = 0
+    position = cigar.beg_query
+    
+    for item in cigar.seq:
+        op = cigar.decode_op(item)
+        length = cigar.decode_len(item)
+        if op == b'=':
+            matches += length
+        elif op == b'X':
+            mismatches.extend(range(position, position + length))
+        else:
+            gaps += length
+        
+        # Deletions consume only the sample, everything else the reference
+        if op != b'D':
+            position += length
+    
+    return matches, tuple(mismatches), gaps
+
+
+@lru_cache(maxsize=4096)
+def _scan_cached(reference: str, sample: str) -> Tuple[int, Tuple[int, ...], int]:
+    """
+    Memoized _scan keyed on the sequence strings themselves.
+    
+    Batch pipelines often compare the same pair more than once; str hashes
+    are cached by the interpreter, so repeat lookups cost one hash probe and
+    a memcmp instead of a fresh scan.
+    
+    Args:
+        reference: Reference sequence
+        sample: Sample sequence
+        
+    Returns:
+        Tuple of (match count, mismatch positions, gap count)
+    """
+    if len(reference) != len(sample) and parasail is not None:
+        return _scan_aligned(reference, sample)
+    return _scan(encode_sequence(reference), encode_sequence(sample))
+
+
+def _analyze_pair(data: Dict, agent_name: str) -> Dict:
+    """
+    Align one reference/sample pair.
+    
+    Kept at module level so batch_align can ship it to worker processes
+    without pickling the agent.
+    
+    Args:
+        data: Dictionary containing 'reference' and 'sample' sequences,
+            optionally with the sample's SequenceFeatures under '_features'
+        agent_name: Name recorded in the result
+        
+    Returns:
+        Dictionary with alignment results
+    """
+    reference = data.get('reference', '')
+    sample = data.get('sample', '')
+    patient_id = data.get('patient_id', 'unknown')
+    
+    if not reference or not sample:
+        return {'error': 'Missing reference or sample sequence'}
+    
+    # Precomputed features of the sample, when the caller supplies them
+    features = data.get('_features')
+    
+    # Single pass yields matches, mismatch positions and gaps
+    matches, mismatches, gaps = _scan_cached(reference, sample)
+    
+    # Alignment score and identity are both the match percentage
+    if len(reference) == len(sample):
+        identity = (matches / len(reference)) * 100
+    else:
+        identity = 0.0
+    alignment_score = identity
+    
+    result = {
+        'patient_id': patient_id,
+        'agent': agent_name,
+        'alignment_score': alignment_score,
+        'identity_percentage': identity,
+        'gaps': gaps,
+        'mismatches': list(mismatches),
+        'reference_length': len(reference),
+        'sample_length': len(sample),
+        'gc_content_reference': calculate_gc_content(reference),
+        'gc_content_sample': features.gc_content if features is not None else calculate_gc_content(sample)
+    }
+    
+    return result
+
+
+class AlignmentResult(NamedTuple):
+    """Logged alignment analysis result."""
+    patient_id: str
+    agent: str
+    alignment_score: float
+    identity_percentage: float
+    gaps: int
+    mismatches: List[int]
+    reference_length: int
+    sample_length: int
+    gc_content_reference: float
+    gc_content_sample: float
 
 
 class SequenceAlignmentAgent(BaseAgent):
     """Agent for performing sequence alignment and comparison tasks."""
     
+    result_type = AlignmentResult
+    
     def __init__(self):
         """Initialize the Sequence Alignment Agent."""
         super().__init__("SequenceAlignmentAgent")
@@ -36,110 +194,90 @@ class SequenceAlignmentAgent(BaseAgent):
         Returns:
             Dictionary with alignment results
         """
-        reference = data.get('reference', '')
-        sample = data.get('sample', '')
-        patient_id = data.get('patient_id', 'unknown')
-        
-        if not reference or not sample:
-            return {'error': 'Missing reference or sample sequence'}
-        
-        # Calculate alignment score
-        alignment_score = self._calculate_alignment_score(reference, sample)
-        
-        # Calculate identity percentage
-        identity = self._calculate_identity(reference, sample)
-        
-        # Find gaps and mismatches
-        gaps, mismatches = self._find_gaps_and_mismatches(reference, sample)
-        
-        result = {
-            'patient_id': patient_id,
-            'agent': self.agent_name,
-            'alignment_score': alignment_score,
-            'identity_percentage': identity,
-            'gaps': gaps,
-            'mismatches': mismatches,
-            'reference_length': len(reference),
-            'sample_length': len(sample),
-            'gc_content_reference': calculate_gc_content(reference),
-            'gc_content_sample': calculate_gc_content(sample)
-        }
-        
-        self.log_result(result)
+        result = _analyze_pair(data, self.agent_name)
+        if 'error' not in result:
+            self.log_result(result)
         return result
     
-    def _calculate_alignment_score(self, seq1: str, seq2: str) -> float:
+    def analyze_batch(self, references: np.ndarray, samples: np.ndarray,
+                      patient_ids: Optional[List[str]] = None,
+                      mismatches: Optional[BatchMismatches] = None) -> List[Dict]:
         """
-        Calculate alignment score using a simple scoring system.
+        Align many equal-length pairs at once.
         
-        Args:
-            seq1: First sequence
-            seq2: Second sequence
-            
-        Returns:
-            Alignment score
-        """
-        if len(seq1) != len(seq2):
-            return 0.0
-        
-        matches = sum(1 for a, b in zip(seq1, seq2) if a == b)
-        return (matches / len(seq1)) * 100
-    
-    def _calculate_identity(self, seq1: str, seq2: str) -> float:
-        """
-        Calculate sequence identity percentage.
+        Gives the same results as analyze on each row, with the mismatch and
+        GC scans done over the whole matrices instead of pair by pair.
         
         Args:
-            seq1: First sequence
-            seq2: Second sequence
+            references: uint8 matrix of shape (num_pairs, sequence_length)
+            samples: uint8 matrix of the same shape as references
+            patient_ids: Patient ID of each row (defaults to 'unknown')
+            mismatches: Precomputed mismatches of the pairs, when the caller
+                shares them across agents
             
         Returns:
-            Identity percentage
+            List of alignment results, one per row
         """
-        if len(seq1) != len(seq2):
-            return 0.0
+        if references.shape != samples.shape:
+            raise ValueError("Sequences must be of equal length")
         
-        identical = sum(1 for a, b in zip(seq1, seq2) if a == b)
-        return (identical / len(seq1)) * 100
-    
-    def _find_gaps_and_mismatches(self, seq1: str, seq2: str) -> Tuple[int, List[int]]:
-        """
-        Find gaps and mismatches between sequences.
-        
-        Args:
-            seq1: First sequence
-            seq2: Second sequence
-            
-        Returns:
-            Tuple of (gap count, list of mismatch positions)
-        """
-        gaps = 0
-        mismatches = []
+        num_pairs, length = references.shape
+        if patient_ids is None:
+            patient_ids = ['unknown'] * num_pairs
+        if length == 0:
+            return [{'error': 'Missing reference or sample sequence'} for _ in range(num_pairs)]
         
-        min_len = min(len(seq1), len(seq2))
+        if mismatches is None:
+            mismatches = BatchMismatches.from_matrices(references, samples)
+        positions, bounds = mismatches.positions, mismatches.bounds
         
-        for i in range(min_len):
-            if seq1[i] != seq2[i]:
-                mismatches.append(i)
+        gc_reference = _GC_LUT[references].sum(axis=1, dtype=np.int64).tolist()
+        gc_sample = _GC_LUT[samples].sum(axis=1, dtype=np.int64).tolist()
         
-        # Count gaps as length difference
-        gaps = abs(len(seq1) - len(seq2))
+        results = []
+        for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+            identity = ((length - (end - start)) / length) * 100
+            result = {
+                'patient_id': patient_ids[i],
+                'agent': self.agent_name,
+                'alignment_score': identity,
+                'identity_percentage': identity,
+                'gaps': 0,
+                'mismatches': positions[start:end].tolist(),
+                'reference_length': length,
+                'sample_length': length,
+                'gc_content_reference': (gc_reference[i] / length) * 100,
+                'gc_content_sample': (gc_sample[i] / length) * 100
+            }
+            self.log_result(result)
+            results.append(result)
         
-        return gaps, mismatches
+        return results
     
-    def batch_align(self, sequences: List[Dict]) -> List[Dict]:
+    def batch_align(self, sequences: List[Dict], max_workers: Optional[int] = None) -> List[Dict]:
         """
         Perform batch alignment on multiple sequence pairs.
         
         Args:
             sequences: List of dictionaries with sequence data
+            max_workers: Number of worker processes (None for one per CPU,
+                1 to align serially in this process)
             
         Returns:
             List of alignment results
         """
-        results = []
-        for seq_data in sequences:
-            result = self.analyze(seq_data)
-            results.append(result)
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        
+        align = partial(_analyze_pair, agent_name=self.agent_name)
+        if max_workers > 1 and len(sequences) > 1:
+            with ProcessPoolExecutor(max_workers=max_workers) as executor:
+                results = list(executor.map(align, sequences, chunksize=8))
+        else:
+            results = [align(seq_data) for seq_data in sequences]
+        
+        for result in results:
+            if 'error' not in result:
+                self.log_result(result)
         
         return results
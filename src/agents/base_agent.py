@@ -3,13 +3,27 @@ Base Agent class for gene sequencing analysis.
 """
 
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List
-import pandas as pd
+from typing import Dict, Any, List, Optional, Type, NamedTuple
+import numpy as np
+import sys
+import os
+
+# Handle imports for both package and standalone execution
+try:
+    from ..utils.sequence_utils import encode_sequence
+except ImportError:
+    # Fallback for standalone or test execution
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.sequence_utils import encode_sequence
 
 
 class BaseAgent(ABC):
     """Abstract base class for all gene sequencing agents."""
     
+    # Compact record type used to store logged results whose keys match its
+    # fields (None keeps every result as a dict)
+    result_type: Optional[Type[NamedTuple]] = None
+    
     def __init__(self, agent_name: str):
         """
         Initialize the base agent.
@@ -18,7 +32,7 @@ class BaseAgent(ABC):
             agent_name: Name identifier for the agent
         """
         self.agent_name = agent_name
-        self.results = []
+        self._results = []
     
     @abstractmethod
     def analyze(self, data: Any) -> Dict:
@@ -33,14 +47,39 @@ class BaseAgent(ABC):
         """
         pass
     
+    def _encoded(self, data: Dict, key: str) -> np.ndarray:
+        """
+        Get the uint8 encoding of a sequence, computing it at most once per dict.
+        
+        The array is stored back on the input under '_<key>_u8' so every
+        agent handed the same patient dict shares a single encoding pass.
+        
+        Args:
+            data: Input dictionary holding the sequence string
+            key: Key of the sequence in data (e.g. 'reference', 'sample')
+            
+        Returns:
+            NumPy uint8 array of the sequence
+        """
+        encoded_key = f'_{key}_u8'
+        if encoded_key not in data:
+            data[encoded_key] = encode_sequence(data[key])
+        return data[encoded_key]
+    
     def log_result(self, result: Dict):
         """
         Log analysis result.
         
+        Results whose keys match the agent's result_type fields are stored as
+        records, which avoids keeping a full dict per analysis; any other dict
+        (e.g. one annotated by the caller) is stored as-is.
+        
         Args:
             result: Result dictionary to log
         """
-        self.results.append(result)
+        if self.result_type is not None and result.keys() == set(self.result_type._fields):
+            result = self.result_type(**result)
+        self._results.append(result)
     
     def get_results(self) -> List[Dict]:
         """
@@ -49,11 +88,24 @@ class BaseAgent(ABC):
         Returns:
             List of result dictionaries
         """
-        return self.results
+        if self.result_type is None:
+            return self._results
+        return [record._asdict() if isinstance(record, self.result_type) else record
+                for record in self._results]
+    
+    @property
+    def results(self) -> List[Dict]:
+        """
+        Logged results as dictionaries (read-only view; see get_results).
+        
+        Records are kept privately, so appending to this list does not log
+        a result; use log_result instead.
+        """
+        return self.get_results()
     
     def clear_results(self):
         """Clear all logged results."""
-        self.results = []
+        self._results = []
     
     def summarize(self) -> Dict:
         """
@@ -64,6 +116,6 @@ class BaseAgent(ABC):
         """
         return {
             'agent_name': self.agent_name,
-            'total_analyses': len(self.results),
-            'results': self.results
+            'total_analyses': len(self._results),
+            'results': self.get_results()
         }
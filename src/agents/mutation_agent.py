@@ -2,7 +2,7 @@
 Mutation Detection Agent for identifying genetic mutations.
 """
 
-from typing import Dict, List
+from typing import Dict, List, NamedTuple, Optional
 import numpy as np
 import sys
 import os
@@ -10,17 +10,37 @@ import os
 # Handle imports for both package and standalone execution
 try:
     from .base_agent import BaseAgent
-    from ..utils.sequence_utils import find_mutations, hamming_distance
+    from ..utils.sequence_utils import MutationTable, BatchMismatches
 except ImportError:
     # Fallback for standalone or test execution
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from base_agent import BaseAgent
-    from utils.sequence_utils import find_mutations, hamming_distance
+    from utils.sequence_utils import MutationTable, BatchMismatches
+
+
+# Transition lookup indexed by (reference byte, sample byte): A<->G, C<->T
+_TS_LUT = np.zeros((256, 256), dtype=np.uint8)
+for _ref, _alt in (b'AG', b'GA', b'CT', b'TC'):
+    _TS_LUT[_ref, _alt] = 1
+
+
+class MutationResult(NamedTuple):
+    """Logged mutation analysis result."""
+    patient_id: str
+    agent: str
+    total_mutations: int
+    mutation_rate: float
+    mutation_types: Dict
+    clinical_significance: str
+    hotspots: List[Dict]
+    mutations: List[Dict]
 
 
 class MutationDetectionAgent(BaseAgent):
     """Agent for detecting and analyzing genetic mutations."""
     
+    result_type = MutationResult
+    
     def __init__(self, significance_threshold: int = 5):
         """
         Initialize the Mutation Detection Agent.
@@ -30,13 +50,19 @@ class MutationDetectionAgent(BaseAgent):
         """
         super().__init__("MutationDetectionAgent")
         self.significance_threshold = significance_threshold
+        # Lower bounds of the low/moderate/high significance bands, clamped to
+        # 1 so they stay sorted (and zero mutations stay 'normal') for t < 1
+        self._thresholds = np.array([1, max(significance_threshold, 1),
+                                     max(significance_threshold * 2, 1)])
+        self._labels = ('normal', 'low', 'moderate', 'high')
     
     def analyze(self, data: Dict) -> Dict:
         """
         Detect and analyze mutations in a sequence.
         
         Args:
-            data: Dictionary containing 'reference' and 'sample' sequences
+            data: Dictionary containing 'reference' and 'sample' sequences,
+                optionally with the sample's SequenceFeatures under '_features'
             
         Returns:
             Dictionary with mutation analysis results
@@ -48,64 +74,97 @@ class MutationDetectionAgent(BaseAgent):
         if not reference or not sample:
             return {'error': 'Missing reference or sample sequence'}
         
-        # Find all mutations
-        mutations = find_mutations(reference, sample)
-        
-        # Categorize mutations
-        mutation_types = self._categorize_mutations(mutations)
-        
-        # Assess clinical significance
-        significance = self._assess_significance(len(mutations))
-        
-        # Calculate mutation rate
-        mutation_rate = (len(mutations) / len(reference)) * 100
+        features = data.get('_features')
+        sample_u8 = features.buf_u8 if features is not None else self._encoded(data, 'sample')
+        reference_u8 = self._encoded(data, 'reference')
+        if len(reference_u8) != len(sample_u8):
+            raise ValueError("Sequences must be of equal length")
         
-        # Identify hotspots
-        hotspots = self._identify_hotspots(mutations, window_size=100)
+        # A single pair is a batch of one
+        return self.analyze_batch(reference_u8[np.newaxis, :], sample_u8[np.newaxis, :],
+                                  patient_ids=[patient_id])[0]
+    
+    def analyze_batch(self, references: np.ndarray, samples: np.ndarray,
+                      patient_ids: Optional[List[str]] = None,
+                      mismatches: Optional[BatchMismatches] = None) -> List[Dict]:
+        """
+        Detect and analyze mutations for many equal-length pairs at once.
         
-        result = {
-            'patient_id': patient_id,
-            'agent': self.agent_name,
-            'total_mutations': len(mutations),
-            'mutation_rate': mutation_rate,
-            'mutation_types': mutation_types,
-            'clinical_significance': significance,
-            'hotspots': hotspots,
-            'mutations': mutations[:20]  # Include first 20 mutations for detail
-        }
+        Args:
+            references: uint8 matrix of shape (num_pairs, sequence_length)
+            samples: uint8 matrix of the same shape as references
+            patient_ids: Patient ID of each row (defaults to 'unknown')
+            mismatches: Precomputed mismatches of the pairs, when the caller
+                shares them across agents
+            
+        Returns:
+            List of mutation analysis results, one per row
+        """
+        if references.shape != samples.shape:
+            raise ValueError("Sequences must be of equal length")
+        
+        num_pairs, length = references.shape
+        if patient_ids is None:
+            patient_ids = ['unknown'] * num_pairs
+        if length == 0:
+            return [{'error': 'Missing reference or sample sequence'} for _ in range(num_pairs)]
+        
+        # All mutations from one compare over the whole matrix
+        if mismatches is None:
+            mismatches = BatchMismatches.from_matrices(references, samples)
+        rows, positions, bounds = mismatches.rows, mismatches.positions, mismatches.bounds
+        ref_bases = references[rows, positions]
+        sample_bases = samples[rows, positions]
+        
+        # Transitions per pair
+        transitions = np.bincount(rows, weights=_TS_LUT[ref_bases, sample_bases],
+                                  minlength=num_pairs).astype(np.int64)
+        
+        # Mutations per 100-base window for every pair
+        window_size = 100
+        num_windows = -(-length // window_size)
+        window_counts = np.bincount(rows * num_windows + positions // window_size,
+                                    minlength=num_pairs * num_windows).reshape(num_pairs, num_windows)
+        
+        results = []
+        for i, (start, end) in enumerate(zip(bounds[:-1], bounds[1:])):
+            total = end - start
+            detail = slice(start, min(end, start + 20))
+            
+            result = {
+                'patient_id': patient_ids[i],
+                'agent': self.agent_name,
+                'total_mutations': total,
+                'mutation_rate': (total / length) * 100,
+                'mutation_types': self._categorize_mutations(int(transitions[i]), total),
+                'clinical_significance': self._assess_significance(total),
+                'hotspots': self._identify_hotspots(window_counts[i], window_size=window_size),
+                # Include first 20 mutations for detail
+                'mutations': MutationTable(positions[detail], ref_bases[detail].tobytes(),
+                                           sample_bases[detail].tobytes())[:]
+            }
+            
+            self.log_result(result)
+            results.append(result)
         
-        self.log_result(result)
-        return result
+        return results
     
-    def _categorize_mutations(self, mutations: List[Dict]) -> Dict:
+    def _categorize_mutations(self, transitions: int, total: int) -> Dict:
         """
         Categorize mutations by type.
         
         Args:
-            mutations: List of mutation dictionaries
+            transitions: Number of transition substitutions
+            total: Total number of substitutions
             
         Returns:
             Dictionary with mutation counts by category
         """
-        categories = {
-            'transitions': 0,  # A<->G, C<->T
-            'transversions': 0,  # All other substitutions
-            'total_substitutions': len(mutations)
+        return {
+            'transitions': transitions,  # A<->G, C<->T
+            'transversions': total - transitions,  # All other substitutions
+            'total_substitutions': total
         }
-        
-        for mutation in mutations:
-            ref = mutation.get('reference', '')
-            sample = mutation.get('sample', '')
-            
-            # Check if it's a transition
-            if (ref == 'A' and sample == 'G') or (ref == 'G' and sample == 'A'):
-                categories['transitions'] += 1
-            elif (ref == 'C' and sample == 'T') or (ref == 'T' and sample == 'C'):
-                categories['transitions'] += 1
-            else:
-                categories['transversions'] += 1
-        
-        return categories
     
     def _assess_significance(self, mutation_count: int) -> str:
         """
@@ -117,42 +176,31 @@ class MutationDetectionAgent(BaseAgent):
         Returns:
             Significance level string
         """
-        if mutation_count == 0:
-            return "normal"
-        elif mutation_count < self.significance_threshold:
-            return "low"
-        elif mutation_count < self.significance_threshold * 2:
-            return "moderate"
-        else:
-            return "high"
+        return self._labels[int(np.searchsorted(self._thresholds, mutation_count, side='right'))]
     
-    def _identify_hotspots(self, mutations: List[Dict], window_size: int = 100) -> List[Dict]:
+    def _identify_hotspots(self, window_counts: np.ndarray, window_size: int = 100) -> List[Dict]:
         """
         Identify mutation hotspots in the sequence.
         
         Args:
-            mutations: List of mutation dictionaries
+            window_counts: Number of mutations in each consecutive window
             window_size: Size of window for hotspot detection
             
         Returns:
             List of hotspot regions
         """
-        if not mutations:
-            return []
-        
-        positions = [m['position'] for m in mutations]
         hotspots = []
         
         # Simple hotspot detection: areas with high mutation density
-        for i in range(0, max(positions) + 1, window_size):
-            window_mutations = [p for p in positions if i <= p < i + window_size]
-            if len(window_mutations) >= 3:  # At least 3 mutations in a window
-                hotspots.append({
-                    'start': i,
-                    'end': i + window_size,
-                    'mutation_count': len(window_mutations),
-                    'density': len(window_mutations) / window_size
-                })
+        for window in np.flatnonzero(window_counts >= 3).tolist():  # At least 3 mutations in a window
+            start = window * window_size
+            mutation_count = int(window_counts[window])
+            hotspots.append({
+                'start': start,
+                'end': start + window_size,
+                'mutation_count': mutation_count,
+                'density': mutation_count / window_size
+            })
         
         return hotspots
     
@@ -178,3 +226,28 @@ class MutationDetectionAgent(BaseAgent):
             return "low_risk"
         else:
             return "normal"
+    
+    def classify_risk_batch(self, results_df) -> np.ndarray:
+        """
+        Classify risk for many mutation analyses at once.
+        
+        Applies the same rules as classify_risk column-wise.
+        
+        Args:
+            results_df: DataFrame (or mapping of columns) of analyze results with
+                'clinical_significance', 'mutation_rate' and 'hotspots' columns
+            
+        Returns:
+            Array of risk classification strings, one per row
+        """
+        significance = np.asarray(results_df['clinical_significance'])
+        mutation_rate = np.asarray(results_df['mutation_rate'], dtype=float)
+        hotspot_counts = np.fromiter((len(h) for h in results_df['hotspots']),
+                                     dtype=np.int64, count=len(mutation_rate))
+        
+        high = (significance == "high") | (mutation_rate > 2.0) | (hotspot_counts > 2)
+        moderate = (significance == "moderate") | (mutation_rate > 1.0) | (hotspot_counts > 0)
+        low = significance == "low"
+        
+        return np.select([high, moderate, low], ["high_risk", "moderate_risk", "low_risk"],
+                         default="normal")
@@ -2,25 +2,50 @@
 Pattern Recognition Agent for identifying conserved patterns and motifs in gene sequences.
 """
 
-from typing import Dict, List, Set
+from typing import Dict, List, Set, Tuple, NamedTuple
 from collections import Counter
+from functools import partial
+import numpy as np
 import sys
 import os
 
 # Handle imports for both package and standalone execution
 try:
     from .base_agent import BaseAgent
-    from ..utils.sequence_utils import find_patterns, calculate_sequence_complexity, sliding_window_analysis
+    from ..utils.sequence_utils import (find_patterns_multi, gc_windows, encode_sequence,
+                                        calculate_sequence_complexity, find_patterns,
+                                        _UPPER_ACGT)
+    from ..utils.pattern_kernels import tandem_scan, repeated_kmers
+    from ..utils.kmer import kmer_complexity
 except ImportError:
     # Fallback for standalone or test execution
     sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
     from base_agent import BaseAgent
-    from utils.sequence_utils import find_patterns, calculate_sequence_complexity, sliding_window_analysis
+    from utils.sequence_utils import (find_patterns_multi, gc_windows, encode_sequence,
+                                      calculate_sequence_complexity, find_patterns,
+                                      _UPPER_ACGT)
+    from utils.pattern_kernels import tandem_scan, repeated_kmers
+    from utils.kmer import kmer_complexity
+
+
+class PatternResult(NamedTuple):
+    """Logged pattern analysis result."""
+    patient_id: str
+    agent: str
+    sequence_length: int
+    complexity_score: float
+    known_motifs: Dict[str, List[int]]
+    repeating_patterns: List[Dict]
+    conserved_regions: List[Dict]
+    tandem_repeats: List[Dict]
+    average_gc_content: float
 
 
 class PatternRecognitionAgent(BaseAgent):
     """Agent for recognizing patterns, motifs, and conserved regions in sequences."""
     
+    result_type = PatternResult
+    
     def __init__(self):
         """Initialize the Pattern Recognition Agent."""
         super().__init__("PatternRecognitionAgent")
@@ -40,7 +65,8 @@ class PatternRecognitionAgent(BaseAgent):
         Analyze sequence for patterns and motifs.
         
         Args:
-            data: Dictionary containing 'sequence' to analyze
+            data: Dictionary containing 'sequence' to analyze, optionally with
+                its SequenceFeatures under '_features'
             
         Returns:
             Dictionary with pattern analysis results
@@ -51,23 +77,37 @@ class PatternRecognitionAgent(BaseAgent):
         if not sequence:
             return {'error': 'Missing sequence'}
         
+        # Reuse precomputed features when the caller supplies them
+        features = data.get('_features')
+        if features is not None:
+            encoded = features.buf_u8
+        else:
+            # Encode once (or reuse the caller's encoding) for the scanners below
+            encoded = self._encoded(data, 'sequence')
+        
         # Find known motifs
         motifs_found = self._find_known_motifs(sequence)
         
         # Identify repeating patterns
-        repeats = self._find_repeating_patterns(sequence)
+        repeats = self._find_repeating_patterns(sequence, encoded=encoded)
         
-        # Calculate sequence complexity
-        complexity = calculate_sequence_complexity(sequence, k=3)
+        # Calculate sequence complexity; packed k-mer codes only cover
+        # uppercase A/C/G/T, so anything else takes the substring count
+        if not _UPPER_ACGT[encoded].all():
+            complexity = calculate_sequence_complexity(sequence, k=3)
+        elif features is not None and features.k == 3:
+            complexity = kmer_complexity(encoded, k=3, codes=features.kmer_codes)
+        else:
+            complexity = kmer_complexity(encoded, k=3)
         
-        # Perform sliding window analysis
-        window_analysis = sliding_window_analysis(sequence, window_size=100)
+        # Perform sliding window GC analysis
+        window_gc = gc_windows(encoded, window_size=100)
         
         # Find conserved regions (regions with high GC content)
-        conserved_regions = self._identify_conserved_regions(window_analysis)
+        conserved_regions = self._identify_conserved_regions(window_gc, window_size=100)
         
         # Find tandem repeats
-        tandem_repeats = self._find_tandem_repeats(sequence)
+        tandem_repeats = self._find_tandem_repeats(sequence, encoded=encoded)
         
         result = {
             'patient_id': patient_id,
@@ -78,7 +118,7 @@ class PatternRecognitionAgent(BaseAgent):
             'repeating_patterns': repeats,
             'conserved_regions': conserved_regions,
             'tandem_repeats': tandem_repeats,
-            'average_gc_content': sum(w['gc_content'] for w in window_analysis) / len(window_analysis) if window_analysis else 0.0
+            'average_gc_content': float(window_gc.mean()) if len(window_gc) else 0.0
         }
         
         self.log_result(result)
@@ -94,17 +134,10 @@ class PatternRecognitionAgent(BaseAgent):
         Returns:
             Dictionary of motif names and their positions
         """
-        motifs_found = {}
-        
-        for motif_name, motif_sequence in self.known_motifs.items():
-            positions = find_patterns(sequence, motif_sequence)
-            if positions:
-                motifs_found[motif_name] = positions
-        
-        return motifs_found
+        return find_patterns_multi(sequence, self.known_motifs)
     
     def _find_repeating_patterns(self, sequence: str, min_length: int = 3, 
-                                 max_length: int = 10) -> List[Dict]:
+                                 max_length: int = 10, encoded: np.ndarray = None) -> List[Dict]:
         """
         Identify repeating patterns in the sequence.
         
@@ -112,41 +145,62 @@ class PatternRecognitionAgent(BaseAgent):
             sequence: DNA sequence
             min_length: Minimum pattern length
             max_length: Maximum pattern length
+            encoded: Optional uint8 encoding of the sequence
             
         Returns:
             List of repeating patterns with their frequency
         """
+        if encoded is None:
+            encoded = encode_sequence(sequence)
         patterns = []
         
+        # Packed k-mer codes only cover uppercase A/C/G/T; other input (soft-
+        # masked or ambiguous bases) is counted as exact substrings instead
+        if _UPPER_ACGT[encoded].all():
+            find_repeats = partial(repeated_kmers, encoded)
+        else:
+            find_repeats = partial(self._repeated_substrings, sequence)
+        
         for length in range(min_length, min(max_length + 1, len(sequence) // 2)):
-            pattern_counts = Counter()
-            
-            for i in range(len(sequence) - length + 1):
-                pattern = sequence[i:i + length]
-                pattern_counts[pattern] += 1
-            
-            # Find patterns that occur more than twice
-            for pattern, count in pattern_counts.items():
-                if count >= 3:  # Pattern appears at least 3 times
-                    positions = find_patterns(sequence, pattern)
-                    patterns.append({
-                        'pattern': pattern,
-                        'length': length,
-                        'frequency': count,
-                        'positions': positions[:5]  # First 5 positions
-                    })
+            # Patterns that appear at least 3 times, in order of first occurrence
+            for count, positions in find_repeats(length, min_count=3):
+                patterns.append({
+                    'pattern': sequence[positions[0]:positions[0] + length],
+                    'length': length,
+                    'frequency': count,
+                    'positions': positions  # First 5 positions
+                })
         
         # Sort by frequency
         patterns.sort(key=lambda x: x['frequency'], reverse=True)
         return patterns[:10]  # Return top 10 patterns
     
-    def _identify_conserved_regions(self, window_analysis: List[Dict], 
+    def _repeated_substrings(self, sequence: str, length: int,
+                             min_count: int = 3) -> List[Tuple[int, List[int]]]:
+        """
+        Find substrings occurring at least min_count times, case-sensitively.
+        
+        Args:
+            sequence: DNA sequence
+            length: Substring length
+            min_count: Minimum number of occurrences
+            
+        Returns:
+            List of (frequency, first 5 positions) tuples ordered by first occurrence
+        """
+        pattern_counts = Counter(sequence[i:i + length]
+                                 for i in range(len(sequence) - length + 1))
+        return [(count, find_patterns(sequence, pattern)[:5])
+                for pattern, count in pattern_counts.items() if count >= min_count]
+    
+    def _identify_conserved_regions(self, window_gc: np.ndarray, window_size: int = 100,
                                    threshold: float = 55.0) -> List[Dict]:
         """
         Identify conserved regions based on GC content.
         
         Args:
-            window_analysis: List of window analysis results
+            window_gc: GC content per window, as returned by gc_windows
+            window_size: Size of the windows (starts are half a window apart)
             threshold: GC content threshold for conservation
             
         Returns:
@@ -154,18 +208,19 @@ class PatternRecognitionAgent(BaseAgent):
         """
         conserved = []
         
-        for window in window_analysis:
-            if window['gc_content'] >= threshold:
-                conserved.append({
-                    'start': window['start'],
-                    'end': window['end'],
-                    'gc_content': window['gc_content']
-                })
+        indices = np.flatnonzero(window_gc >= threshold)
+        for start, gc_content in zip((indices * (window_size // 2)).tolist(),
+                                     window_gc[indices].tolist()):
+            conserved.append({
+                'start': start,
+                'end': start + window_size,
+                'gc_content': gc_content
+            })
         
         return conserved
     
     def _find_tandem_repeats(self, sequence: str, min_unit_length: int = 2,
-                            max_unit_length: int = 6) -> List[Dict]:
+                            max_unit_length: int = 6, encoded: np.ndarray = None) -> List[Dict]:
         """
         Find tandem repeats in the sequence.
         
@@ -173,34 +228,23 @@ class PatternRecognitionAgent(BaseAgent):
             sequence: DNA sequence
             min_unit_length: Minimum repeat unit length
             max_unit_length: Maximum repeat unit length
+            encoded: Optional uint8 encoding of the sequence
             
         Returns:
             List of tandem repeat regions
         """
+        if encoded is None:
+            encoded = encode_sequence(sequence)
         tandem_repeats = []
         
-        for unit_length in range(min_unit_length, max_unit_length + 1):
-            i = 0
-            while i < len(sequence) - unit_length * 2:
-                unit = sequence[i:i + unit_length]
-                repeat_count = 1
-                j = i + unit_length
-                
-                # Count consecutive repeats
-                while j + unit_length <= len(sequence) and sequence[j:j + unit_length] == unit:
-                    repeat_count += 1
-                    j += unit_length
-                
-                if repeat_count >= 3:  # At least 3 consecutive repeats
-                    tandem_repeats.append({
-                        'position': i,
-                        'unit': unit,
-                        'unit_length': unit_length,
-                        'repeat_count': repeat_count,
-                        'total_length': unit_length * repeat_count
-                    })
-                    i = j
-                else:
-                    i += 1
+        for position, unit_length, repeat_count, total_length in tandem_scan(
+                encoded, min_unit_length, max_unit_length).tolist():
+            tandem_repeats.append({
+                'position': position,
+                'unit': sequence[position:position + unit_length],
+                'unit_length': unit_length,
+                'repeat_count': repeat_count,
+                'total_length': total_length
+            })
         
         return tandem_repeats
@@ -5,11 +5,35 @@ This module generates synthetic human gene sequence data for testing
 and development purposes.
 """
 
-import random
 import pandas as pd
 import numpy as np
-from typing import List, Tuple, Dict
+from typing import List, Tuple, Dict, Union
 import json
+import sys
+import os
+
+# Handle imports for both package and standalone execution
+try:
+    from ..utils.sequence_utils import encode_2bit
+except ImportError:
+    # Fallback for standalone or test execution
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from utils.sequence_utils import encode_2bit
+
+
+# Byte values of self.nucleotides, indexed by nucleotide code 0-3
+_NUCLEOTIDE_BYTES = np.frombuffer(b'ATGC', dtype=np.uint8)
+
+# Substitute for each base byte and shift 1-3: the base `shift` codes further
+# along ATGC (mod 4), so a substitution never reproduces the original base.
+# Any other byte (N, lowercase, ...) is treated as code 0, so it is always
+# replaced by a valid base.
+_SUBSTITUTES = np.zeros((256, 4), dtype=np.uint8)
+for _shift in range(1, 4):
+    _SUBSTITUTES[:, _shift] = _NUCLEOTIDE_BYTES[_shift]
+for _code, _base in enumerate(_NUCLEOTIDE_BYTES.tolist()):
+    for _shift in range(1, 4):
+        _SUBSTITUTES[_base, _shift] = _NUCLEOTIDE_BYTES[(_code + _shift) % 4]
 
 
 class SyntheticGeneDataGenerator:
@@ -22,8 +46,7 @@ class SyntheticGeneDataGenerator:
         Args:
             seed: Random seed for reproducibility
         """
-        random.seed(seed)
-        np.random.seed(seed)
+        self.rng = np.random.default_rng(seed)
         self.nucleotides = ['A', 'T', 'G', 'C']
         
     def generate_sequence(self, length: int = 1000) -> str:
@@ -36,40 +59,52 @@ class SyntheticGeneDataGenerator:
         Returns:
             DNA sequence string
         """
-        return ''.join(random.choices(self.nucleotides, k=length))
+        codes = self.rng.integers(0, 4, size=length, dtype=np.uint8)
+        return _NUCLEOTIDE_BYTES[codes].tobytes().decode('ascii')
     
-    def introduce_mutation(self, sequence: str, mutation_rate: float = 0.01) -> Tuple[str, List[Dict]]:
+    def introduce_mutation(self, sequence: str, mutation_rate: float = 0.01,
+                           return_details: bool = True) -> Tuple[str, Union[List[Dict], np.ndarray]]:
         """
         Introduce random mutations into a sequence.
         
         Args:
             sequence: Original DNA sequence
             mutation_rate: Probability of mutation at each position
+            return_details: Whether to build a dictionary per mutation; if False
+                an array of mutated positions is returned instead
             
         Returns:
             Tuple of (mutated sequence, list of mutation details)
         """
-        sequence_list = list(sequence)
-        mutations = []
-        
-        for i in range(len(sequence_list)):
-            if random.random() < mutation_rate:
-                original = sequence_list[i]
-                # Choose a different nucleotide
-                new_nucleotide = random.choice([n for n in self.nucleotides if n != original])
-                sequence_list[i] = new_nucleotide
-                mutations.append({
-                    'position': i,
-                    'original': original,
-                    'mutated': new_nucleotide,
-                    'type': 'substitution'
-                })
-        
-        return ''.join(sequence_list), mutations
+        bases = np.frombuffer(sequence.encode('ascii'), dtype=np.uint8).copy()
+        positions = np.flatnonzero(self.rng.random(len(bases)) < mutation_rate)
+        
+        # Replace each mutated base with one of its three precomputed substitutes
+        original = bases[positions]
+        offsets = self.rng.integers(1, 4, size=len(positions), dtype=np.uint8)
+        bases[positions] = _SUBSTITUTES[original, offsets]
+        mutated = bases.tobytes().decode('ascii')
+        
+        if not return_details:
+            return mutated, positions
+        
+        mutations = [
+            {
+                'position': position,
+                'original': chr(original_base),
+                'mutated': chr(new_base),
+                'type': 'substitution'
+            }
+            for position, original_base, new_base in zip(
+                positions.tolist(), original.tolist(), bases[positions].tolist())
+        ]
+        
+        return mutated, mutations
     
     def generate_gene_dataset(self, num_samples: int = 100, 
                              sequence_length: int = 1000,
-                             with_mutations: bool = True) -> pd.DataFrame:
+                             with_mutations: bool = True,
+                             packed: bool = False) -> pd.DataFrame:
         """
         Generate a complete dataset of gene sequences.
         
@@ -77,61 +112,76 @@ class SyntheticGeneDataGenerator:
             num_samples: Number of gene samples to generate
             sequence_length: Length of each gene sequence
             with_mutations: Whether to include mutated sequences
+            packed: Whether to add 'reference_2bit' and 'sample_2bit' columns
+                holding the sequences packed 4 bases per byte (encode_2bit)
             
         Returns:
-            DataFrame with gene sequence data
+            DataFrame with one row per patient holding the reference and
+            sample sequences
         """
-        data = []
+        gene_types = ['BRCA1', 'BRCA2', 'TP53', 'EGFR', 'KRAS', 'MYC', 'PTEN']
+        health_statuses = ['normal', 'monitor', 'at_risk']
+        
+        # Per-patient draws: gene type, 70% chance of mutation, mutation rate
+        gene_codes = self.rng.integers(0, len(gene_types), size=num_samples)
+        if with_mutations:
+            has_mutation = self.rng.random(num_samples) > 0.3
+        else:
+            has_mutation = np.zeros(num_samples, dtype=bool)
+        mutation_rates = self.rng.uniform(0.005, 0.02, size=num_samples)
+        
+        # One row per patient; unmutated patients use the reference as sample
+        references = [None] * num_samples
+        samples = [None] * num_samples
+        mutation_count = np.zeros(num_samples, dtype=np.int32)
         
         for i in range(num_samples):
-            # Generate reference sequence
             reference = self.generate_sequence(sequence_length)
+            references[i] = reference
+            samples[i] = reference
             
-            # Generate patient ID
-            patient_id = f"PATIENT_{i:04d}"
-            
-            # Randomly assign gene type
-            gene_types = ['BRCA1', 'BRCA2', 'TP53', 'EGFR', 'KRAS', 'MYC', 'PTEN']
-            gene_type = random.choice(gene_types)
-            
-            # Add reference sequence
-            data.append({
-                'patient_id': patient_id,
-                'gene_type': gene_type,
-                'sequence': reference,
-                'is_mutated': False,
-                'mutation_count': 0,
-                'health_status': 'normal'
-            })
-            
-            # Add mutated version if requested
-            if with_mutations and random.random() > 0.3:  # 70% chance of mutation
-                mutated, mutations = self.introduce_mutation(reference, 
-                                                             mutation_rate=random.uniform(0.005, 0.02))
-                health_status = 'at_risk' if len(mutations) > 5 else 'monitor'
-                
-                data.append({
-                    'patient_id': patient_id,
-                    'gene_type': gene_type,
-                    'sequence': mutated,
-                    'is_mutated': True,
-                    'mutation_count': len(mutations),
-                    'health_status': health_status
-                })
-        
-        return pd.DataFrame(data)
+            if has_mutation[i]:
+                mutated, positions = self.introduce_mutation(reference,
+                                                             mutation_rate=mutation_rates[i],
+                                                             return_details=False)
+                samples[i] = mutated
+                mutation_count[i] = len(positions)
+        
+        # normal without mutations, at_risk above 5 mutations, monitor otherwise
+        health_codes = np.where(has_mutation, np.where(mutation_count > 5, 2, 1), 0)
+        
+        dataset = pd.DataFrame({
+            'patient_id': [f"PATIENT_{i:04d}" for i in range(num_samples)],
+            'gene_type': pd.Categorical.from_codes(gene_codes, categories=gene_types),
+            'reference_sequence': references,
+            'sample_sequence': samples,
+            'is_mutated': has_mutation,
+            'mutation_count': mutation_count,
+            'health_status': pd.Categorical.from_codes(health_codes, categories=health_statuses)
+        })
+        
+        if packed:
+            dataset['reference_2bit'] = [encode_2bit(seq).tobytes() for seq in references]
+            dataset['sample_2bit'] = [encode_2bit(seq).tobytes() for seq in samples]
+        
+        return dataset
     
     def save_dataset(self, dataset: pd.DataFrame, filepath: str):
         """
-        Save the generated dataset to a CSV file.
+        Save the generated dataset to a zstd-compressed Parquet file.
+        
+        Paths ending in '.csv' are still written as CSV.
         
         Args:
             dataset: DataFrame containing the gene data
-            filepath: Path where to save the CSV file
+            filepath: Path where to save the dataset
         """
-        dataset.to_csv(filepath, index=False)
+        if filepath.endswith('.csv'):
+            dataset.to_csv(filepath, index=False)
+        else:
+            dataset.to_parquet(filepath, compression='zstd', engine='pyarrow', index=False)
         print(f"Dataset saved to {filepath}")
-        print(f"Total samples: {len(dataset)}")
+        print(f"Total patients: {len(dataset)}")
         print(f"Mutated samples: {dataset['is_mutated'].sum()}")
 
 
@@ -148,12 +198,12 @@ def main():
     )
     
     # Save to data directory
-    output_path = 'src/data/synthetic_gene_sequences.csv'
+    output_path = 'src/data/synthetic_gene_sequences.parquet'
     generator.save_dataset(dataset, output_path)
     
     # Print statistics
     print("\nDataset Statistics:")
-    print(f"Total sequences: {len(dataset)}")
+    print(f"Total patients: {len(dataset)}")
     print(f"Gene types: {dataset['gene_type'].unique().tolist()}")
     print(f"\nHealth status distribution:")
     print(dataset['health_status'].value_counts())
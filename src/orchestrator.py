@@ -4,9 +4,16 @@ Agentic AI Orchestrator for Gene Sequencing Analysis
 This module coordinates multiple AI agents to perform comprehensive gene sequence analysis.
 """
 
-import pandas as pd
-import json
-from typing import Dict, List
+import numpy as np
+import pyarrow as pa
+import pyarrow.csv as pa_csv
+import pyarrow.parquet as pq
+import orjson
+import logging
+import copy
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional
 import sys
 import os
 
@@ -15,12 +22,67 @@ try:
     from .agents.alignment_agent import SequenceAlignmentAgent
     from .agents.mutation_agent import MutationDetectionAgent
     from .agents.pattern_agent import PatternRecognitionAgent
+    from .utils.sequence_utils import SequenceFeatures, BatchMismatches
 except ImportError:
     # Fallback for standalone or test execution
     sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
     from agents.alignment_agent import SequenceAlignmentAgent
     from agents.mutation_agent import MutationDetectionAgent
     from agents.pattern_agent import PatternRecognitionAgent
+    from utils.sequence_utils import SequenceFeatures, BatchMismatches
+
+logger = logging.getLogger(__name__)
+
+
+def _binary_views(column: pa.ChunkedArray) -> List[np.ndarray]:
+    """
+    Get a uint8 view of every value in an Arrow string or binary column.
+    
+    The column is cast to large_binary and each value becomes a slice of the
+    chunk's data buffer, so no per-sequence bytes or str objects are built.
+    
+    Args:
+        column: Arrow column of sequences
+        
+    Returns:
+        List of uint8 arrays, one per row
+    """
+    views = []
+    for chunk in column.cast(pa.large_binary()).chunks:
+        _, offsets_buffer, data_buffer = chunk.buffers()
+        offsets = np.frombuffer(offsets_buffer, dtype=np.int64)[chunk.offset:chunk.offset + len(chunk) + 1]
+        if data_buffer is None:
+            data = np.empty(0, dtype=np.uint8)
+        else:
+            data = np.frombuffer(data_buffer, dtype=np.uint8)
+        views.extend(data[start:end] for start, end in zip(offsets[:-1].tolist(), offsets[1:].tolist()))
+    return views
+
+
+def _binary_matrix(column: pa.ChunkedArray) -> np.ndarray:
+    """
+    View an Arrow column of equal-length sequences as a 2D uint8 matrix.
+    
+    Args:
+        column: Arrow column of sequences
+        
+    Returns:
+        uint8 array of shape (num_rows, sequence_length)
+    """
+    array = column.cast(pa.large_binary()).combine_chunks()
+    _, offsets_buffer, data_buffer = array.buffers()
+    offsets = np.frombuffer(offsets_buffer, dtype=np.int64)[array.offset:array.offset + len(array) + 1]
+    
+    lengths = np.diff(offsets)
+    if len(lengths) and np.any(lengths != lengths[0]):
+        raise ValueError("Batched analysis requires sequences of equal length")
+    length = int(lengths[0]) if len(lengths) else 0
+    
+    if data_buffer is None:
+        return np.empty((len(array), length), dtype=np.uint8)
+    # Values are stored back to back, so the data buffer reshapes without a copy
+    data = np.frombuffer(data_buffer, dtype=np.uint8)[offsets[0]:offsets[-1]]
+    return data.reshape(len(array), length)
 
 
 class GeneSequencingOrchestrator:
@@ -28,17 +90,42 @@ class GeneSequencingOrchestrator:
     Main orchestrator that coordinates multiple agents for comprehensive gene analysis.
     """
     
-    def __init__(self):
-        """Initialize the orchestrator with all agents."""
+    def __init__(self, verbose: bool = False):
+        """
+        Initialize the orchestrator with all agents.
+        
+        Args:
+            verbose: Whether to log each patient's summary at INFO level
+                (otherwise it is logged at DEBUG)
+        """
+        self.verbose = verbose
         self.alignment_agent = SequenceAlignmentAgent()
         self.mutation_agent = MutationDetectionAgent(significance_threshold=5)
         self.pattern_agent = PatternRecognitionAgent()
         self.analysis_results = []
+        # Patients per risk level, kept up to date as results are recorded
+        self._risk_counts = Counter()
     
     def analyze_patient(self, patient_data: Dict) -> Dict:
         """
         Perform comprehensive analysis on a single patient's gene sequence.
         
+        Args:
+            patient_data: Dictionary containing patient's sequence data
+            
+        Returns:
+            Comprehensive analysis results
+        """
+        results = self._run_agents(patient_data)
+        self._record_patient(results)
+        return results
+    
+    def _run_agents(self, patient_data: Dict) -> Dict:
+        """
+        Run all agents and the overall assessment for one patient.
+        
+        Performs no logging so it can run inside worker processes.
+        
         Args:
             patient_data: Dictionary containing patient's sequence data
             
@@ -46,9 +133,6 @@ class GeneSequencingOrchestrator:
             Comprehensive analysis results
         """
         patient_id = patient_data.get('patient_id', 'unknown')
-        print(f"\n{'='*60}")
-        print(f"Analyzing patient: {patient_id}")
-        print(f"{'='*60}")
         
         results = {
             'patient_id': patient_id,
@@ -56,98 +140,248 @@ class GeneSequencingOrchestrator:
             'analyses': {}
         }
         
+        # Derive the sample's encoding, GC count and k-mer codes once for all agents
+        sample = patient_data.get('sample', '')
+        if sample and '_features' not in patient_data:
+            patient_data['_features'] = SequenceFeatures.from_sequence(
+                patient_data.get('_sample_u8', sample))
+        
         # Agent 1: Sequence Alignment
-        print(f"\n[Agent 1] Sequence Alignment Agent analyzing...")
-        alignment_result = self.alignment_agent.analyze(patient_data)
-        results['analyses']['alignment'] = alignment_result
-        print(f"  ✓ Alignment Score: {alignment_result.get('alignment_score', 0):.2f}%")
-        print(f"  ✓ Identity: {alignment_result.get('identity_percentage', 0):.2f}%")
+        results['analyses']['alignment'] = self.alignment_agent.analyze(patient_data)
         
         # Agent 2: Mutation Detection
-        print(f"\n[Agent 2] Mutation Detection Agent analyzing...")
-        mutation_result = self.mutation_agent.analyze(patient_data)
-        results['analyses']['mutation'] = mutation_result
-        print(f"  ✓ Mutations Found: {mutation_result.get('total_mutations', 0)}")
-        print(f"  ✓ Mutation Rate: {mutation_result.get('mutation_rate', 0):.3f}%")
-        print(f"  ✓ Clinical Significance: {mutation_result.get('clinical_significance', 'unknown')}")
+        results['analyses']['mutation'] = self.mutation_agent.analyze(patient_data)
         
         # Agent 3: Pattern Recognition
-        print(f"\n[Agent 3] Pattern Recognition Agent analyzing...")
         pattern_data = {
-            'sequence': patient_data.get('sample', ''),
+            'sequence': sample,
             'patient_id': patient_id
         }
-        pattern_result = self.pattern_agent.analyze(pattern_data)
-        results['analyses']['pattern'] = pattern_result
-        print(f"  ✓ Sequence Complexity: {pattern_result.get('complexity_score', 0):.3f}")
-        print(f"  ✓ Known Motifs Found: {len(pattern_result.get('known_motifs', {}))}")
-        print(f"  ✓ Repeating Patterns: {len(pattern_result.get('repeating_patterns', []))}")
+        if '_features' in patient_data:
+            pattern_data['_features'] = patient_data['_features']
+        results['analyses']['pattern'] = self.pattern_agent.analyze(pattern_data)
         
         # Generate comprehensive assessment
-        assessment = self._generate_assessment(results)
-        results['assessment'] = assessment
+        results['assessment'] = self._generate_assessment(results)
+        
+        return results
+    
+    def _log_patient(self, results: Dict):
+        """
+        Log the per-agent summary of one patient's analysis as a single record.
+        
+        Args:
+            results: Comprehensive analysis results from _run_agents
+        """
+        level = logging.INFO if self.verbose else logging.DEBUG
+        if not logger.isEnabledFor(level):
+            return
         
-        print(f"\n[Final Assessment]")
-        print(f"  ✓ Overall Risk: {assessment['risk_level']}")
-        print(f"  ✓ Recommendation: {assessment['recommendation']}")
+        alignment_result = results['analyses']['alignment']
+        mutation_result = results['analyses']['mutation']
+        pattern_result = results['analyses']['pattern']
+        assessment = results['assessment']
         
+        lines = [
+            f"\n{'='*60}",
+            f"Analyzing patient: {results['patient_id']}",
+            f"{'='*60}",
+            f"\n[Agent 1] Sequence Alignment Agent analyzing...",
+            f"  ✓ Alignment Score: {alignment_result.get('alignment_score', 0):.2f}%",
+            f"  ✓ Identity: {alignment_result.get('identity_percentage', 0):.2f}%",
+            f"\n[Agent 2] Mutation Detection Agent analyzing...",
+            f"  ✓ Mutations Found: {mutation_result.get('total_mutations', 0)}",
+            f"  ✓ Mutation Rate: {mutation_result.get('mutation_rate', 0):.3f}%",
+            f"  ✓ Clinical Significance: {mutation_result.get('clinical_significance', 'unknown')}",
+            f"\n[Agent 3] Pattern Recognition Agent analyzing...",
+            f"  ✓ Sequence Complexity: {pattern_result.get('complexity_score', 0):.3f}",
+            f"  ✓ Known Motifs Found: {len(pattern_result.get('known_motifs', {}))}",
+            f"  ✓ Repeating Patterns: {len(pattern_result.get('repeating_patterns', []))}",
+            f"\n[Final Assessment]",
+            f"  ✓ Overall Risk: {assessment['risk_level']}",
+            f"  ✓ Recommendation: {assessment['recommendation']}"
+        ]
+        logger.log(level, '\n'.join(lines))
+    
+    def _record_patient(self, results: Dict):
+        """
+        Log one patient's summary and add it to the accumulated results.
+        
+        Args:
+            results: Comprehensive analysis results from _run_agents
+        """
+        self._log_patient(results)
         self.analysis_results.append(results)
-        return results
+        self._risk_counts[results['assessment']['risk_level']] += 1
+    
+    def _log_agent_results(self, results: Dict):
+        """
+        Log agent results computed in a worker process on this process's agents.
+        
+        Args:
+            results: Comprehensive analysis results from _run_agents
+        """
+        analyses = results['analyses']
+        for agent, key in ((self.alignment_agent, 'alignment'),
+                           (self.mutation_agent, 'mutation'),
+                           (self.pattern_agent, 'pattern')):
+            if 'error' not in analyses[key]:
+                agent.log_result(analyses[key])
+    
+    def _worker_copy(self) -> 'GeneSequencingOrchestrator':
+        """
+        Copy this orchestrator and its agents without any accumulated results.
+        
+        The copy is what analyze_dataset's workers run, so they use the same
+        agent configuration and method overrides as the serial path.
+        
+        Returns:
+            Orchestrator with the same configuration and empty results
+        """
+        worker = copy.copy(self)
+        worker.analysis_results = []
+        worker._risk_counts = Counter()
+        for name in ('alignment_agent', 'mutation_agent', 'pattern_agent'):
+            agent = copy.copy(getattr(self, name))
+            agent.clear_results()
+            setattr(worker, name, agent)
+        return worker
     
-    def analyze_dataset(self, dataset_path: str, max_samples: int = None) -> List[Dict]:
+    def _load_table(self, dataset_path: str, max_samples: int = None) -> pa.Table:
+        """
+        Load the patient rows of a dataset as an Arrow table.
+        
+        Args:
+            dataset_path: Path to the Parquet (or CSV) dataset
+            max_samples: Maximum number of patients to keep (None for all)
+            
+        Returns:
+            Arrow table with one row per patient
+        """
+        logger.info(f"\n{'='*60}\nGENE SEQUENCING AGENTIC AI ANALYSIS SYSTEM\n{'='*60}")
+        
+        # Load dataset
+        logger.info(f"\nLoading dataset from: {dataset_path}")
+        columns = ['patient_id', 'gene_type', 'reference_sequence', 'sample_sequence', 'is_mutated']
+        if dataset_path.endswith('.csv'):
+            table = pa_csv.read_csv(dataset_path,
+                                    convert_options=pa_csv.ConvertOptions(include_columns=columns))
+        else:
+            table = pq.read_table(dataset_path, columns=columns)
+        logger.info(f"Total patients loaded: {table.num_rows}")
+        
+        if max_samples:
+            table = table.slice(0, max_samples)
+        return table
+    
+    def analyze_dataset(self, dataset_path: str, max_samples: int = None,
+                        max_workers: Optional[int] = None) -> List[Dict]:
         """
         Analyze a complete dataset of gene sequences.
         
         Args:
-            dataset_path: Path to the CSV dataset
+            dataset_path: Path to the Parquet (or CSV) dataset
             max_samples: Maximum number of samples to analyze (None for all)
+            max_workers: Number of worker processes (None for one per CPU,
+                1 to analyze serially in this process)
             
         Returns:
             List of analysis results for all patients
         """
-        print(f"\n{'='*60}")
-        print("GENE SEQUENCING AGENTIC AI ANALYSIS SYSTEM")
-        print(f"{'='*60}")
+        table = self._load_table(dataset_path, max_samples)
         
-        # Load dataset
-        print(f"\nLoading dataset from: {dataset_path}")
-        df = pd.read_csv(dataset_path)
-        print(f"Total sequences loaded: {len(df)}")
+        # Sequences stay in Arrow buffers; agents get zero-copy uint8 views and
+        # the strings are decoded straight from those views
+        references = _binary_views(table.column('reference_sequence'))
+        samples = _binary_views(table.column('sample_sequence'))
         
-        # Group by patient to get reference and sample pairs
-        patients = df.groupby('patient_id')
+        patient_dicts = [
+            {
+                'patient_id': patient_id,
+                'gene_type': gene_type,
+                'reference': reference_u8.tobytes().decode('ascii'),
+                'sample': sample_u8.tobytes().decode('ascii'),
+                'known_mutation_status': is_mutated,
+                '_reference_u8': reference_u8,
+                '_sample_u8': sample_u8
+            }
+            for patient_id, gene_type, is_mutated, reference_u8, sample_u8 in zip(
+                table.column('patient_id').to_pylist(),
+                table.column('gene_type').to_pylist(),
+                table.column('is_mutated').to_pylist(),
+                references,
+                samples)
+        ]
         
-        results = []
-        count = 0
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        
+        if max_workers <= 1 or len(patient_dicts) <= 1:
+            return [self.analyze_patient(patient_data) for patient_data in patient_dicts]
+        
+        # Agents run in the workers; logging and result bookkeeping stay here
+        with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                                 initargs=(self._worker_copy(),)) as executor:
+            results = list(executor.map(_analyze_in_worker, patient_dicts, chunksize=8))
+        
+        for patient_results in results:
+            self._log_agent_results(patient_results)
+            self._record_patient(patient_results)
         
-        for patient_id, group in patients:
-            if max_samples and count >= max_samples:
-                break
+        return results
+    
+    def analyze_dataset_batched(self, dataset_path: str, max_samples: int = None) -> List[Dict]:
+        """
+        Analyze a dataset of equal-length sequences as whole matrices.
+        
+        References and samples are loaded as (num_patients, sequence_length)
+        uint8 matrices and handed to the alignment and mutation agents'
+        analyze_batch; only pattern recognition still runs per patient.
+        Results match analyze_dataset.
+        
+        Args:
+            dataset_path: Path to the Parquet (or CSV) dataset
+            max_samples: Maximum number of samples to analyze (None for all)
             
-            # Get reference (non-mutated) and sample (potentially mutated) sequences
-            reference_row = group[group['is_mutated'] == False]
-            sample_row = group[group['is_mutated'] == True]
+        Returns:
+            List of analysis results for all patients
+        """
+        table = self._load_table(dataset_path, max_samples)
+        
+        references = _binary_matrix(table.column('reference_sequence'))
+        samples = _binary_matrix(table.column('sample_sequence'))
+        patient_ids = table.column('patient_id').to_pylist()
+        gene_types = table.column('gene_type').to_pylist()
+        
+        # One compare over the matrices feeds both agents
+        mismatches = BatchMismatches.from_matrices(references, samples)
+        alignment_results = self.alignment_agent.analyze_batch(references, samples, patient_ids,
+                                                               mismatches=mismatches)
+        mutation_results = self.mutation_agent.analyze_batch(references, samples, patient_ids,
+                                                             mismatches=mismatches)
+        
+        results = []
+        for i, patient_id in enumerate(patient_ids):
+            sample_u8 = samples[i]
+            pattern_result = self.pattern_agent.analyze({
+                'sequence': sample_u8.tobytes().decode('ascii'),
+                'patient_id': patient_id,
+                '_features': SequenceFeatures.from_sequence(sample_u8)
+            })
             
-            if len(reference_row) > 0:
-                reference = reference_row.iloc[0]
-                
-                # If no mutated sample, compare with itself
-                if len(sample_row) > 0:
-                    sample = sample_row.iloc[0]
-                else:
-                    sample = reference
-                
-                patient_data = {
-                    'patient_id': patient_id,
-                    'gene_type': reference['gene_type'],
-                    'reference': reference['sequence'],
-                    'sample': sample['sequence'],
-                    'known_mutation_status': sample['is_mutated']
+            patient_results = {
+                'patient_id': patient_id,
+                'gene_type': gene_types[i],
+                'analyses': {
+                    'alignment': alignment_results[i],
+                    'mutation': mutation_results[i],
+                    'pattern': pattern_result
                 }
-                
-                result = self.analyze_patient(patient_data)
-                results.append(result)
-                count += 1
+            }
+            patient_results['assessment'] = self._generate_assessment(patient_results)
+            
+            self._record_patient(patient_results)
+            results.append(patient_results)
         
         return results
     
@@ -190,52 +424,93 @@ class GeneSequencingOrchestrator:
             'sequence_identity': identity
         }
     
-    def generate_report(self, output_path: str = 'analysis_report.json'):
+    def generate_report(self, output_path: str = 'analysis_report.json', compact: bool = False):
         """
         Generate a comprehensive analysis report.
         
         Args:
             output_path: Path to save the report
+            compact: Whether to write the JSON without indentation
         """
         report = {
             'total_patients_analyzed': len(self.analysis_results),
             'analyses': self.analysis_results,
             'summary': {
-                'high_risk': sum(1 for r in self.analysis_results 
-                                if r['assessment']['risk_level'] == 'HIGH'),
-                'moderate_risk': sum(1 for r in self.analysis_results 
-                                    if r['assessment']['risk_level'] == 'MODERATE'),
-                'low_risk': sum(1 for r in self.analysis_results 
-                               if r['assessment']['risk_level'] == 'LOW'),
-                'normal': sum(1 for r in self.analysis_results 
-                             if r['assessment']['risk_level'] == 'NORMAL')
+                'high_risk': self._risk_counts['HIGH'],
+                'moderate_risk': self._risk_counts['MODERATE'],
+                'low_risk': self._risk_counts['LOW'],
+                'normal': self._risk_counts['NORMAL']
             }
         }
         
-        with open(output_path, 'w') as f:
-            json.dump(report, f, indent=2)
+        # orjson writes bytes directly and serializes NumPy values natively
+        option = orjson.OPT_SERIALIZE_NUMPY
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(report, option=option))
         
-        print(f"\n{'='*60}")
-        print("ANALYSIS REPORT GENERATED")
-        print(f"{'='*60}")
-        print(f"Report saved to: {output_path}")
-        print(f"\nSummary:")
-        print(f"  Total Patients: {report['total_patients_analyzed']}")
-        print(f"  High Risk: {report['summary']['high_risk']}")
-        print(f"  Moderate Risk: {report['summary']['moderate_risk']}")
-        print(f"  Low Risk: {report['summary']['low_risk']}")
-        print(f"  Normal: {report['summary']['normal']}")
+        logger.info(
+            f"\n{'='*60}\n"
+            "ANALYSIS REPORT GENERATED\n"
+            f"{'='*60}\n"
+            f"Report saved to: {output_path}\n"
+            f"\nSummary:\n"
+            f"  Total Patients: {report['total_patients_analyzed']}\n"
+            f"  High Risk: {report['summary']['high_risk']}\n"
+            f"  Moderate Risk: {report['summary']['moderate_risk']}\n"
+            f"  Low Risk: {report['summary']['low_risk']}\n"
+            f"  Normal: {report['summary']['normal']}"
+        )
         
         return report
 
 
+# Per-process orchestrator used by analyze_dataset's worker pool
+_worker_orchestrator = None
+
+
+def _init_worker(orchestrator: GeneSequencingOrchestrator):
+    """
+    Install the parent's orchestrator copy in the current worker process.
+    
+    Args:
+        orchestrator: Result-free copy from GeneSequencingOrchestrator._worker_copy
+    """
+    global _worker_orchestrator
+    _worker_orchestrator = orchestrator
+
+
+def _analyze_in_worker(patient_data: Dict) -> Dict:
+    """
+    Analyze one patient inside a worker process.
+    
+    Args:
+        patient_data: Dictionary containing patient's sequence data
+        
+    Returns:
+        Comprehensive analysis results
+    """
+    results = _worker_orchestrator._run_agents(patient_data)
+    
+    # The parent logs these results; don't let the worker's agents accumulate them
+    for agent in (_worker_orchestrator.alignment_agent,
+                  _worker_orchestrator.mutation_agent,
+                  _worker_orchestrator.pattern_agent):
+        agent.clear_results()
+    
+    return results
+
+
 def main():
     """Main execution function."""
+    logging.basicConfig(level=logging.INFO, format='%(message)s', stream=sys.stdout)
+    
     # Initialize orchestrator
-    orchestrator = GeneSequencingOrchestrator()
+    orchestrator = GeneSequencingOrchestrator(verbose=True)
     
     # Analyze dataset
-    dataset_path = 'src/data/synthetic_gene_sequences.csv'
+    dataset_path = 'src/data/synthetic_gene_sequences.parquet'
     results = orchestrator.analyze_dataset(dataset_path, max_samples=5)
     
     # Generate report
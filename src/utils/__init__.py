@@ -1,21 +1,39 @@
 """Utilities Package"""
 from .sequence_utils import (
+    encode_sequence,
+    encode_2bit,
+    decode_2bit,
+    hamming_distance_packed,
+    SequenceFeatures,
+    BatchMismatches,
     calculate_gc_content,
     hamming_distance,
+    MutationTable,
     find_mutations,
     sliding_window_analysis,
+    gc_windows,
     find_patterns,
+    find_patterns_multi,
     calculate_sequence_complexity,
     reverse_complement,
     analyze_sequence_composition
 )
 
 __all__ = [
+    'encode_sequence',
+    'encode_2bit',
+    'decode_2bit',
+    'hamming_distance_packed',
+    'SequenceFeatures',
+    'BatchMismatches',
     'calculate_gc_content',
     'hamming_distance',
+    'MutationTable',
     'find_mutations',
     'sliding_window_analysis',
+    'gc_windows',
     'find_patterns',
+    'find_patterns_multi',
     'calculate_sequence_complexity',
     'reverse_complement',
     'analyze_sequence_composition'
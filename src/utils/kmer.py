@@ -0,0 +1,83 @@
+"""
+K-mer encoding and counting on 2-bit packed integer codes.
+"""
+
+import numpy as np
+from typing import Tuple
+
+
+# 2-bit base codes (A=0, C=1, G=2, T=3); any other byte maps to 4 (invalid)
+_BASE_CODE = np.full(256, 4, dtype=np.uint8)
+for _code, _base in enumerate(b'ACGT'):
+    _BASE_CODE[_base] = _code
+
+
+def kmer_codes(arr: np.ndarray, k: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode every k-mer of a sequence as a packed 2-bit integer.
+
+    Args:
+        arr: Sequence as a uint8 array
+        k: K-mer length (at most 16)
+
+    Returns:
+        Tuple of (start positions, uint32 k-mer codes); k-mers containing
+        bases other than A, C, G or T are skipped
+    """
+    num = len(arr) - k + 1
+    if num <= 0:
+        return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.uint32)
+
+    bases = _BASE_CODE[arr]
+    codes = np.zeros(num, dtype=np.uint32)
+    for offset in range(k):
+        codes = (codes << 2) | bases[offset:offset + num]
+
+    invalid = np.concatenate(([0], np.cumsum(bases > 3)))
+    valid = invalid[k:] == invalid[:num]
+    starts = np.flatnonzero(valid)
+    return starts, codes[starts]
+
+
+def kmer_counts(codes: np.ndarray, k: int) -> np.ndarray:
+    """
+    Count k-mer occurrences from their packed codes.
+
+    Args:
+        codes: K-mer codes produced by kmer_codes
+        k: K-mer length
+    
+    Returns:
+        Int64 array of length 4**k indexed by k-mer code
+    """
+    return np.bincount(codes, minlength=4 ** k)
+
+
+def kmer_complexity(arr: np.ndarray, k: int = 3, codes: np.ndarray = None) -> float:
+    """
+    Calculate k-mer diversity from a 4**k-bin histogram of packed codes.
+
+    Equivalent to calculate_sequence_complexity for A/C/G/T sequences. For
+    small k (64 bins at k=3) the distinct count is a count_nonzero over a
+    fixed-size table; larger k fall back to np.unique over the codes.
+
+    Args:
+        arr: Sequence as a uint8 array
+        k: K-mer length (at most 16)
+        codes: Optional k-mer codes of arr already computed by kmer_codes
+
+    Returns:
+        Complexity score (0-1, higher is more complex)
+    """
+    total_kmers = len(arr) - k + 1
+    if total_kmers <= 0:
+        return 0.0
+
+    if codes is None:
+        _, codes = kmer_codes(arr, k)
+    if k <= 8:
+        # At most 65536 bins: count non-empty bins of a fixed histogram
+        unique_kmers = int(np.count_nonzero(kmer_counts(codes, k)))
+    else:
+        unique_kmers = len(np.unique(codes))
+    return unique_kmers / min(total_kmers, 4 ** k)
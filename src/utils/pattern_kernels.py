@@ -0,0 +1,99 @@
+"""
+Vectorized scanning kernels for repeat and k-mer detection on encoded sequences.
+"""
+
+import numpy as np
+from typing import List, Tuple
+
+from .kmer import kmer_codes
+
+
+def _run_lengths(mask: np.ndarray) -> np.ndarray:
+    """
+    Count consecutive True values starting at each position of a boolean mask.
+
+    Args:
+        mask: Boolean array
+
+    Returns:
+        Array where element i is the length of the True run beginning at i
+    """
+    idx = np.arange(len(mask))
+    # Nearest False at or after each position, via a reversed running minimum
+    next_break = np.minimum.accumulate(np.where(mask, len(mask), idx)[::-1])[::-1]
+    return next_break - idx
+
+
+def tandem_scan(arr: np.ndarray, min_unit: int, max_unit: int) -> np.ndarray:
+    """
+    Find tandem repeats of at least 3 consecutive copies in an encoded sequence.
+
+    A unit of length u starting at i repeats c times exactly when
+    arr[i + t] == arr[i + t + u] for the first (c - 1) * u offsets, so the
+    copy count falls out of the run length of a single shifted compare.
+    Positions are then taken greedily, skipping past each reported repeat.
+
+    Args:
+        arr: Sequence as a uint8 array
+        min_unit: Minimum repeat unit length
+        max_unit: Maximum repeat unit length
+
+    Returns:
+        Int64 array of shape (N, 4) with columns
+        (position, unit_length, repeat_count, total_length)
+    """
+    n = len(arr)
+    rows = []
+
+    for unit in range(min_unit, max_unit + 1):
+        limit = n - unit * 2
+        if limit <= 0:
+            continue
+
+        runs = _run_lengths(arr[unit:] == arr[:-unit])
+        copies = 1 + runs[:limit] // unit
+        candidates = np.flatnonzero(copies >= 3)
+
+        k = 0
+        while k < len(candidates):
+            i = int(candidates[k])
+            count = int(copies[i])
+            rows.append((i, unit, count, unit * count))
+            k = int(np.searchsorted(candidates, i + unit * count))
+
+    return np.array(rows, dtype=np.int64).reshape(-1, 4)
+
+
+def repeated_kmers(arr: np.ndarray, k: int, min_count: int = 3,
+                   max_positions: int = 5) -> List[Tuple[int, List[int]]]:
+    """
+    Find k-mers occurring at least min_count times.
+
+    Args:
+        arr: Sequence as a uint8 array
+        k: K-mer length (at most 16)
+        min_count: Minimum number of occurrences
+        max_positions: Maximum number of positions to report per k-mer
+
+    Returns:
+        List of (frequency, first positions) tuples ordered by first occurrence
+    """
+    starts, codes = kmer_codes(arr, k)
+    if len(codes) == 0:
+        return []
+
+    # One stable sort groups equal codes; group sizes are the k-mer counts
+    # and each group lists its start positions in ascending order
+    order = np.argsort(codes, kind='stable')
+    sorted_codes = codes[order]
+    group_starts = np.flatnonzero(np.concatenate(([True], sorted_codes[1:] != sorted_codes[:-1])))
+    counts = np.diff(np.append(group_starts, len(codes)))
+
+    repeats = []
+    for offset, count in zip(group_starts[counts >= min_count].tolist(),
+                             counts[counts >= min_count].tolist()):
+        positions = starts[order[offset:offset + min(count, max_positions)]].tolist()
+        repeats.append((count, positions))
+
+    repeats.sort(key=lambda r: r[1][0])
+    return repeats
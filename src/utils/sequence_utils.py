@@ -3,24 +3,232 @@ Utility functions for gene sequence processing and analysis.
 """
 
 import numpy as np
+from dataclasses import dataclass
+from functools import lru_cache
 from typing import List, Dict, Tuple
-from collections import Counter
 
+from .kmer import _BASE_CODE, kmer_codes, kmer_complexity
 
-def calculate_gc_content(sequence: str) -> float:
+# Optional dependency: single-pass multi-pattern search
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+# True for the uppercase A/C/G/T bytes, the only ones with 2-bit codes
+_UPPER_ACGT = np.zeros(256, dtype=bool)
+_UPPER_ACGT[list(b'ACGT')] = True
+
+# 1 for G and C bytes, 0 elsewhere
+_GC_LUT = np.zeros(256, dtype=np.uint8)
+_GC_LUT[[ord('G'), ord('C')]] = 1
+
+# Byte translation table mapping each base to its complement
+_COMP_TABLE = bytes.maketrans(b'ATGCatgc', b'TACGtacg')
+
+# A/C/G/T byte values indexed by 2-bit code
+_CODE_BASES = np.frombuffer(b'ACGT', dtype=np.uint8)
+
+# Bit offsets of the four 2-bit codes within a packed byte
+_BYTE_SHIFTS = np.array([0, 2, 4, 6], dtype=np.uint8)
+_LOW_BITS = np.uint64(0x5555555555555555)
+
+# Number of differing bases encoded by each XOR of two packed bytes
+_PACKED_DIFF = np.array([sum((x >> shift) & 3 != 0 for shift in (0, 2, 4, 6))
+                         for x in range(256)], dtype=np.uint8)
+
+
+def encode_sequence(sequence: str) -> np.ndarray:
     """
-    Calculate the GC content (percentage of G and C nucleotides) in a DNA sequence.
+    Encode a DNA sequence as a read-only uint8 array of ASCII codes.
     
     Args:
         sequence: DNA sequence string
         
+    Returns:
+        NumPy uint8 array viewing the sequence bytes
+    """
+    return np.frombuffer(sequence.encode('ascii'), dtype=np.uint8)
+
+
+def encode_2bit(sequence) -> np.ndarray:
+    """
+    Pack a DNA sequence into 2 bits per base, 4 bases per byte.
+    
+    Base i occupies bits 2*(i % 4) of byte i // 4 (A=0, C=1, G=2, T=3).
+    
+    Args:
+        sequence: DNA sequence string or uint8 array of A/C/G/T
+        
+    Returns:
+        NumPy uint8 array of ceil(len / 4) bytes; the last byte is
+        zero-padded (as 'A')
+    """
+    if isinstance(sequence, str):
+        sequence = encode_sequence(sequence)
+    
+    codes = _BASE_CODE[sequence]
+    if np.any(codes > 3):
+        raise ValueError("Sequence must contain only A, C, G and T")
+    
+    padded = np.zeros(-(-len(codes) // 4) * 4, dtype=np.uint8)
+    padded[:len(codes)] = codes
+    quads = padded.reshape(-1, 4)
+    return quads[:, 0] | (quads[:, 1] << 2) | (quads[:, 2] << 4) | (quads[:, 3] << 6)
+
+
+def decode_2bit(packed: np.ndarray, length: int) -> str:
+    """
+    Unpack a sequence packed with encode_2bit.
+    
+    Args:
+        packed: Packed uint8 array
+        length: Number of bases in the original sequence
+        
+    Returns:
+        DNA sequence string
+    """
+    codes = (packed[:, None] >> _BYTE_SHIFTS) & 3
+    return _CODE_BASES[codes.ravel()[:length]].tobytes().decode('ascii')
+
+
+def hamming_distance_packed(packed1: np.ndarray, packed2: np.ndarray) -> int:
+    """
+    Calculate Hamming distance between two sequences packed with encode_2bit.
+    
+    Padding bases are identical in both inputs, so they never count.
+    
+    Args:
+        packed1: First packed sequence
+        packed2: Second packed sequence
+        
+    Returns:
+        Number of positions at which the sequences differ
+    """
+    if len(packed1) != len(packed2):
+        raise ValueError("Sequences must be of equal length")
+    
+    diff = np.asarray(packed1, dtype=np.uint8) ^ np.asarray(packed2, dtype=np.uint8)
+    
+    # Whole 8-byte blocks as little-endian words (32 bases each): one flag
+    # bit per base, set when either bit of its 2-bit code differs
+    n_words = len(diff) // 8
+    words = diff[:n_words * 8].view('<u8')
+    flags = (words | (words >> np.uint64(1))) & _LOW_BITS
+    if hasattr(np, 'bitwise_count'):
+        count = int(np.bitwise_count(flags).sum())
+    else:
+        count = int(np.unpackbits(flags.view(np.uint8)).sum())
+    
+    # Remaining bytes through the per-byte table
+    return count + int(_PACKED_DIFF[diff[n_words * 8:]].sum(dtype=np.int64))
+
+
+@dataclass(frozen=True)
+class SequenceFeatures:
+    """
+    Per-sequence features computed once and shared by every agent.
+    
+    Attributes:
+        buf_u8: Sequence as a uint8 array
+        gc_count: Number of G and C bases
+        composition: 256-bin histogram of byte values
+        k: K-mer length of kmer_codes
+        kmer_codes: Packed 2-bit codes of every A/C/G/T k-mer
+    """
+    buf_u8: np.ndarray
+    gc_count: int
+    composition: np.ndarray
+    k: int
+    kmer_codes: np.ndarray
+    
+    @classmethod
+    def from_sequence(cls, sequence, k: int = 3) -> 'SequenceFeatures':
+        """
+        Compute the features of a sequence.
+        
+        Args:
+            sequence: DNA sequence string or uint8 array
+            k: K-mer length for kmer_codes
+            
+        Returns:
+            SequenceFeatures for the sequence
+        """
+        buf = encode_sequence(sequence) if isinstance(sequence, str) else sequence
+        composition = np.bincount(buf, minlength=256)
+        _, codes = kmer_codes(buf, k)
+        return cls(buf_u8=buf,
+                   gc_count=int(composition[ord('G')] + composition[ord('C')]),
+                   composition=composition,
+                   k=k,
+                   kmer_codes=codes)
+    
+    @property
+    def gc_content(self) -> float:
+        """GC content as a percentage, as calculate_gc_content would return."""
+        if len(self.buf_u8) == 0:
+            return 0.0
+        return (self.gc_count / len(self.buf_u8)) * 100
+
+
+@dataclass(frozen=True)
+class BatchMismatches:
+    """
+    Mismatch positions of many equal-length reference/sample pairs.
+    
+    Computed once per batch so every agent working on the same matrices
+    shares a single compare and nonzero pass.
+    
+    Attributes:
+        rows: Pair index of each mismatch
+        positions: Position of each mismatch within its pair
+        bounds: Offsets into rows/positions; pair i spans bounds[i]:bounds[i + 1]
+    """
+    rows: np.ndarray
+    positions: np.ndarray
+    bounds: List[int]
+    
+    @classmethod
+    def from_matrices(cls, references: np.ndarray, samples: np.ndarray) -> 'BatchMismatches':
+        """
+        Find the mismatches of every pair.
+        
+        Args:
+            references: uint8 matrix of shape (num_pairs, sequence_length)
+            samples: uint8 matrix of the same shape as references
+            
+        Returns:
+            BatchMismatches for the pairs
+        """
+        if references.shape != samples.shape:
+            raise ValueError("Sequences must be of equal length")
+        
+        # nonzero walks rows in order, so each pair's positions form a sorted run
+        rows, positions = np.nonzero(references != samples)
+        counts = np.bincount(rows, minlength=len(references))
+        return cls(rows=rows,
+                   positions=positions,
+                   bounds=np.concatenate(([0], np.cumsum(counts))).tolist())
+
+
+def calculate_gc_content(sequence) -> float:
+    """
+    Calculate the GC content (percentage of G and C nucleotides) in a DNA sequence.
+    
+    Args:
+        sequence: DNA sequence string or uint8 array
+        
     Returns:
         GC content as a percentage (0-100)
     """
-    if not sequence:
+    if len(sequence) == 0:
         return 0.0
     
-    gc_count = sequence.count('G') + sequence.count('C')
+    if isinstance(sequence, str):
+        # Two C-level str.count scans beat encoding for typical gene lengths
+        gc_count = sequence.count('G') + sequence.count('C')
+    else:
+        gc_count = int(np.count_nonzero(_GC_LUT[sequence]))
     return (gc_count / len(sequence)) * 100
 
 
@@ -38,34 +246,79 @@ def hamming_distance(seq1: str, seq2: str) -> int:
     if len(seq1) != len(seq2):
         raise ValueError("Sequences must be of equal length")
     
-    return sum(c1 != c2 for c1, c2 in zip(seq1, seq2))
+    return int(np.count_nonzero(encode_sequence(seq1) != encode_sequence(seq2)))
+
+
+class MutationTable:
+    """
+    Columnar set of substitutions between a reference and a sample.
+    
+    String keys return whole columns ('position' as an int array, 'reference'
+    and 'sample' as bytes of the differing bases). Integer indexing, slicing
+    and iteration build the per-mutation dictionaries on demand.
+    """
+    
+    __slots__ = ('position', 'reference', 'sample')
+    
+    def __init__(self, position: np.ndarray, reference: bytes, sample: bytes):
+        """
+        Initialize the table from its columns.
+        
+        Args:
+            position: Sorted array of mutated positions
+            reference: Reference bases at those positions
+            sample: Sample bases at those positions
+        """
+        self.position = position
+        self.reference = reference
+        self.sample = sample
+    
+    def __len__(self) -> int:
+        return len(self.position)
+    
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            if key not in self.__slots__:
+                raise KeyError(key)
+            return getattr(self, key)
+        if isinstance(key, slice):
+            return [self._record(i) for i in range(len(self))[key]]
+        return self._record(range(len(self))[key])
+    
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self._record(i)
+    
+    def _record(self, i: int) -> Dict:
+        return {
+            'position': int(self.position[i]),
+            'reference': chr(self.reference[i]),
+            'sample': chr(self.sample[i]),
+            'type': 'substitution'
+        }
 
 
-def find_mutations(reference: str, sample: str) -> List[Dict]:
+def find_mutations(reference, sample) -> MutationTable:
     """
     Find all mutations between a reference and sample sequence.
     
     Args:
-        reference: Reference DNA sequence
-        sample: Sample DNA sequence to compare
+        reference: Reference DNA sequence (string or uint8 array)
+        sample: Sample DNA sequence to compare (string or uint8 array)
         
     Returns:
-        List of dictionaries containing mutation details
+        MutationTable of mutation details
     """
     if len(reference) != len(sample):
         raise ValueError("Sequences must be of equal length")
     
-    mutations = []
-    for i, (ref_base, sample_base) in enumerate(zip(reference, sample)):
-        if ref_base != sample_base:
-            mutations.append({
-                'position': i,
-                'reference': ref_base,
-                'sample': sample_base,
-                'type': 'substitution'
-            })
+    if isinstance(reference, str):
+        reference = encode_sequence(reference)
+    if isinstance(sample, str):
+        sample = encode_sequence(sample)
     
-    return mutations
+    positions = np.flatnonzero(reference != sample)
+    return MutationTable(positions, reference[positions].tobytes(), sample[positions].tobytes())
 
 
 def sliding_window_analysis(sequence: str, window_size: int = 100) -> List[Dict]:
@@ -81,18 +334,41 @@ def sliding_window_analysis(sequence: str, window_size: int = 100) -> List[Dict]
     """
     results = []
     
-    for i in range(0, len(sequence) - window_size + 1, window_size // 2):
-        window = sequence[i:i + window_size]
+    # GC per window from one prefix-sum pass; dicts are built from the arrays
+    step = window_size // 2
+    window_gc = gc_windows(encode_sequence(sequence), window_size, step)
+    for start, gc_content in zip(range(0, len(window_gc) * step, step), window_gc.tolist()):
         results.append({
-            'start': i,
-            'end': i + window_size,
-            'gc_content': calculate_gc_content(window),
-            'length': len(window)
+            'start': start,
+            'end': start + window_size,
+            'gc_content': gc_content,
+            'length': window_size
         })
     
     return results
 
 
+def gc_windows(encoded: np.ndarray, window_size: int = 100, step: int = None) -> np.ndarray:
+    """
+    Calculate GC content for every sliding window using a prefix sum.
+    
+    Args:
+        encoded: DNA sequence as a uint8 array
+        window_size: Size of the sliding window
+        step: Distance between window starts (defaults to half the window)
+        
+    Returns:
+        Array of GC content percentages, one per window start
+        range(0, len(encoded) - window_size + 1, step)
+    """
+    if step is None:
+        step = window_size // 2
+    
+    gc_prefix = np.concatenate(([0], np.cumsum(_GC_LUT[encoded], dtype=np.int64)))
+    starts = np.arange(0, len(encoded) - window_size + 1, step)
+    return ((gc_prefix[starts + window_size] - gc_prefix[starts]) / window_size) * 100
+
+
 def find_patterns(sequence: str, pattern: str) -> List[int]:
     """
     Find all occurrences of a pattern in a sequence.
@@ -105,18 +381,79 @@ def find_patterns(sequence: str, pattern: str) -> List[int]:
         List of starting positions where pattern is found
     """
     positions = []
-    start = 0
+    if len(pattern) > len(sequence):
+        return positions
     
-    while True:
-        pos = sequence.find(pattern, start)
-        if pos == -1:
-            break
+    # str.find is a C-level two-way/memchr search; bind it once for the loop
+    find = sequence.find
+    pos = find(pattern)
+    while pos != -1:
         positions.append(pos)
-        start = pos + 1
+        pos = find(pattern, pos + 1)
     
     return positions
 
 
+@lru_cache(maxsize=64)
+def _pattern_automaton(patterns: Tuple[Tuple[str, str], ...]):
+    """
+    Build (and memoize) an Aho-Corasick automaton over named patterns.
+    
+    Args:
+        patterns: Tuple of (name, pattern) pairs
+        
+    Returns:
+        Automaton whose values are (names, pattern length) for each pattern
+    """
+    names_by_pattern = {}
+    for name, pattern in patterns:
+        names_by_pattern.setdefault(pattern, []).append(name)
+    
+    automaton = ahocorasick.Automaton()
+    for pattern, names in names_by_pattern.items():
+        automaton.add_word(pattern, (names, len(pattern)))
+    automaton.make_automaton()
+    return automaton
+
+
+def find_patterns_multi(sequence: str, patterns: Dict[str, str]) -> Dict[str, List[int]]:
+    """
+    Find all occurrences of several named patterns in a sequence.
+    
+    With pyahocorasick installed every pattern is matched in a single pass
+    over the sequence; otherwise each pattern is searched with find_patterns.
+    
+    Args:
+        sequence: DNA sequence to search
+        patterns: Dictionary mapping pattern names to patterns
+        
+    Returns:
+        Dictionary of pattern names and their starting positions, in the
+        order of patterns and omitting patterns that were not found
+    """
+    if not patterns:
+        return {}
+    
+    if ahocorasick is None:
+        found = {}
+        for name, pattern in patterns.items():
+            positions = find_patterns(sequence, pattern)
+            if positions:
+                found[name] = positions
+        return found
+    
+    # The automaton cannot hold empty patterns (nor be built from none), so
+    # those go through find_patterns, which matches them at every offset
+    hits = {name: find_patterns(sequence, pattern)
+            for name, pattern in patterns.items() if not pattern}
+    words = tuple((name, pattern) for name, pattern in patterns.items() if pattern)
+    if words:
+        for end, (names, length) in _pattern_automaton(words).iter(sequence):
+            for name in names:
+                hits.setdefault(name, []).append(end - length + 1)
+    return {name: hits[name] for name in patterns if hits.get(name)}
+
+
 def calculate_sequence_complexity(sequence: str, k: int = 3) -> float:
     """
     Calculate sequence complexity using k-mer diversity.
@@ -131,6 +468,13 @@ def calculate_sequence_complexity(sequence: str, k: int = 3) -> float:
     if len(sequence) < k:
         return 0.0
     
+    # Packed 2-bit k-mer codes for plain uppercase A/C/G/T input; anything
+    # else keeps the case-sensitive substring definition below
+    if k <= 16 and sequence.isascii():
+        encoded = encode_sequence(sequence)
+        if _UPPER_ACGT[encoded].all():
+            return kmer_complexity(encoded, k)
+    
     kmers = [sequence[i:i+k] for i in range(len(sequence) - k + 1)]
     unique_kmers = len(set(kmers))
     total_possible = min(len(kmers), 4**k)  # 4^k possible k-mers
@@ -148,8 +492,7 @@ def reverse_complement(sequence: str) -> str:
     Returns:
         Reverse complement sequence
     """
-    complement = {'A': 'T', 'T': 'A', 'G': 'C', 'C': 'G'}
-    return ''.join(complement.get(base, base) for base in reversed(sequence))
+    return sequence.encode('ascii').translate(_COMP_TABLE)[::-1].decode('ascii')
 
 
 def analyze_sequence_composition(sequence: str) -> Dict:
@@ -162,18 +505,20 @@ def analyze_sequence_composition(sequence: str) -> Dict:
     Returns:
         Dictionary with composition statistics
     """
-    counts = Counter(sequence)
+    # One histogram pass over the bytes gives every base count at once
+    counts = np.bincount(encode_sequence(sequence), minlength=256)
+    a, t, g, c = (int(counts[base]) for base in b'ATGC')
     total = len(sequence)
     
     return {
         'total_length': total,
-        'A_count': counts.get('A', 0),
-        'T_count': counts.get('T', 0),
-        'G_count': counts.get('G', 0),
-        'C_count': counts.get('C', 0),
-        'A_percent': (counts.get('A', 0) / total * 100) if total > 0 else 0,
-        'T_percent': (counts.get('T', 0) / total * 100) if total > 0 else 0,
-        'G_percent': (counts.get('G', 0) / total * 100) if total > 0 else 0,
-        'C_percent': (counts.get('C', 0) / total * 100) if total > 0 else 0,
-        'gc_content': calculate_gc_content(sequence)
+        'A_count': a,
+        'T_count': t,
+        'G_count': g,
+        'C_count': c,
+        'A_percent': (a / total * 100) if total > 0 else 0,
+        'T_percent': (t / total * 100) if total > 0 else 0,
+        'G_percent': (g / total * 100) if total > 0 else 0,
+        'C_percent': (c / total * 100) if total > 0 else 0,
+        'gc_content': ((g + c) / total * 100) if total > 0 else 0.0
     }
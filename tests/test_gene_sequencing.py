@@ -5,10 +5,17 @@ Test suite for Gene Sequencing Agentic AI System
 import unittest
 import sys
 import os
+import io
+import tempfile
+import contextlib
+import json
+import numpy as np
+import pandas as pd
 
 # Add src directory to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
+import agents.alignment_agent as alignment_module
 from agents.alignment_agent import SequenceAlignmentAgent
 from agents.mutation_agent import MutationDetectionAgent
 from agents.pattern_agent import PatternRecognitionAgent
@@ -16,9 +23,21 @@ from utils.sequence_utils import (
     calculate_gc_content, 
     hamming_distance, 
     find_mutations,
-    find_patterns
+    find_patterns,
+    find_patterns_multi,
+    sliding_window_analysis,
+    gc_windows,
+    encode_sequence,
+    encode_2bit,
+    decode_2bit,
+    hamming_distance_packed,
+    SequenceFeatures,
+    BatchMismatches,
+    calculate_sequence_complexity,
+    reverse_complement
 )
 from data.generate_dataset import SyntheticGeneDataGenerator
+from orchestrator import GeneSequencingOrchestrator
 
 
 class TestSequenceUtils(unittest.TestCase):
@@ -30,6 +49,21 @@ class TestSequenceUtils(unittest.TestCase):
         gc_content = calculate_gc_content(sequence)
         self.assertEqual(gc_content, 50.0)
     
+    def test_gc_windows(self):
+        """Test prefix-sum GC windows against per-window GC content."""
+        sequence = "GGCCATATGCGCATAT" * 8
+        windows = sliding_window_analysis(sequence, window_size=20)
+        window_gc = gc_windows(encode_sequence(sequence), window_size=20)
+        
+        self.assertEqual(window_gc.tolist(), [w['gc_content'] for w in windows])
+    
+    def test_sequence_complexity(self):
+        """Test k-mer complexity on packed codes and on other alphabets."""
+        self.assertEqual(calculate_sequence_complexity("AAAAAAAA"), 1 / 6)
+        self.assertEqual(calculate_sequence_complexity("ACGTACGTAC", k=2), 4 / 9)
+        self.assertEqual(calculate_sequence_complexity("acgtNacgt"), 5 / 7)
+        self.assertEqual(calculate_sequence_complexity("AC", k=3), 0.0)
+    
     def test_hamming_distance(self):
         """Test Hamming distance calculation."""
         seq1 = "ATGC"
@@ -37,6 +71,26 @@ class TestSequenceUtils(unittest.TestCase):
         distance = hamming_distance(seq1, seq2)
         self.assertEqual(distance, 1)
     
+    def test_encode_2bit(self):
+        """Test 4-bases-per-byte packing, unpacking and packed Hamming distance."""
+        seq1 = "ACGTTGCAACG"
+        seq2 = "ACCTTGCAACT"
+        packed1 = encode_2bit(seq1)
+        
+        self.assertEqual(len(packed1), 3)
+        self.assertEqual(decode_2bit(packed1, len(seq1)), seq1)
+        self.assertEqual(hamming_distance_packed(packed1, encode_2bit(seq2)),
+                         hamming_distance(seq1, seq2))
+        for invalid in ("ACGN", "acgt"):
+            with self.assertRaises(ValueError):
+                encode_2bit(invalid)
+        
+        # Long enough for the 64-bit word path plus a byte-table tail
+        seq1 = "ACGT" * 20
+        seq2 = "ACGA" * 10 + "TCGT" * 10
+        self.assertEqual(hamming_distance_packed(encode_2bit(seq1), encode_2bit(seq2)),
+                         hamming_distance(seq1, seq2))
+    
     def test_find_mutations(self):
         """Test mutation detection."""
         reference = "ATGC"
@@ -44,6 +98,15 @@ class TestSequenceUtils(unittest.TestCase):
         mutations = find_mutations(reference, sample)
         self.assertEqual(len(mutations), 1)
         self.assertEqual(mutations[0]['position'], 2)
+        
+        self.assertEqual(mutations['position'].tolist(), [2])
+        self.assertEqual((mutations['reference'], mutations['sample']), (b'G', b'C'))
+        self.assertEqual(list(mutations), [{'position': 2, 'reference': 'G',
+                                            'sample': 'C', 'type': 'substitution'}])
+        
+        # Downstream hotspot detection relies on ascending positions
+        positions = [m['position'] for m in find_mutations("ATGCATGC", "TTGGATCC")]
+        self.assertEqual(positions, sorted(positions))
     
     def test_find_patterns(self):
         """Test pattern finding."""
@@ -51,6 +114,32 @@ class TestSequenceUtils(unittest.TestCase):
         pattern = "ATG"
         positions = find_patterns(sequence, pattern)
         self.assertEqual(len(positions), 3)
+    
+    def test_find_patterns_multi(self):
+        """Test multi-pattern search, including overlapping and shared patterns."""
+        sequence = "AAATATAAAGG"
+        patterns = {'poly_a': 'AA', 'tata': 'TATAAA', 'missing': 'CCC', 'tata_alias': 'TATAAA'}
+        found = find_patterns_multi(sequence, patterns)
+        
+        self.assertEqual(found, {'poly_a': [0, 1, 6, 7], 'tata': [3], 'tata_alias': [3]})
+        for name, positions in found.items():
+            self.assertEqual(positions, find_patterns(sequence, patterns[name]))
+    
+    def test_find_patterns_multi_degenerate(self):
+        """Test empty pattern sets and empty patterns match find_patterns."""
+        self.assertEqual(find_patterns_multi("ACGT", {}), {})
+        self.assertEqual(find_patterns_multi("ACGT", {'empty': ''}), {'empty': [0, 1, 2, 3, 4]})
+        self.assertEqual(find_patterns_multi("ACGT", {'empty': '', 'cg': 'CG', 'long': 'ACGTA'}),
+                         {'empty': find_patterns("ACGT", ''), 'cg': [1]})
+        
+        agent = PatternRecognitionAgent()
+        agent.known_motifs = {}
+        self.assertEqual(agent.analyze({'sequence': 'TATAAAGG'})['known_motifs'], {})
+    
+    def test_reverse_complement(self):
+        """Test reverse complement via the byte translation table."""
+        self.assertEqual(reverse_complement("ATGCCN"), "NGGCAT")
+        self.assertEqual(reverse_complement("atgc"), "gcat")
 
 
 class TestAgents(unittest.TestCase):
@@ -77,6 +166,82 @@ class TestAgents(unittest.TestCase):
         self.assertIn('patient_id', result)
         self.assertEqual(result['patient_id'], 'TEST_001')
     
+    def test_alignment_mismatches(self):
+        """Test mismatch positions and identity from the alignment agent."""
+        agent = SequenceAlignmentAgent()
+        result = agent.analyze(self.patient_data)
+        
+        self.assertEqual(result['mismatches'], [7])
+        self.assertEqual(result['gaps'], 0)
+        self.assertAlmostEqual(result['identity_percentage'], 15 / 16 * 100)
+        
+        # Repeat analyses of the same pair must not share mutable results
+        result['mismatches'].append(99)
+        self.assertEqual(agent.analyze(self.patient_data)['mismatches'], [7])
+    
+    @unittest.skipIf(alignment_module.parasail is None, "parasail not installed")
+    def test_alignment_unequal_lengths(self):
+        """Test unequal-length pairs are aligned rather than compared by offset."""
+        agent = SequenceAlignmentAgent()
+        reference = "ACGTTGCAAGGCTTAC" * 3
+        sample = reference[:20] + reference[21:30] + "T" + reference[31:]
+        result = agent.analyze({'reference': reference, 'sample': sample})
+        
+        self.assertEqual(result['gaps'], 1)
+        self.assertEqual(result['mismatches'], [30])
+
+    @unittest.skipIf(alignment_module.parasail is None, "parasail not installed")
+    def test_alignment_overhangs(self):
+        """Test leading and trailing length differences all count as gaps."""
+        agent = SequenceAlignmentAgent()
+        reference = "ACGTTGCAAGGCTTAC" * 3
+        samples = {
+            'leading insertion': ("TTTTT" + reference, 5),
+            'trailing insertion': (reference + "GGGG", 4),
+            'leading deletion': (reference[5:], 5),
+            'trailing deletion': (reference[:-5], 5),
+        }
+        for name, (sample, gaps) in samples.items():
+            with self.subTest(name):
+                result = agent.analyze({'reference': reference, 'sample': sample})
+                self.assertEqual(result['gaps'], gaps)
+                self.assertEqual(result['mismatches'], [])
+
+    def test_batch_align(self):
+        """Test parallel and serial batch alignment agree."""
+        pairs = [self.patient_data, dict(self.patient_data, sample=self.reference)]
+        parallel_agent = SequenceAlignmentAgent()
+        serial_agent = SequenceAlignmentAgent()
+        
+        parallel = parallel_agent.batch_align(pairs, max_workers=2)
+        serial = serial_agent.batch_align(pairs, max_workers=1)
+        
+        self.assertEqual(parallel, serial)
+        self.assertEqual([r['mismatches'] for r in parallel], [[7], []])
+        self.assertEqual(len(parallel_agent.get_results()), 2)
+    
+    def test_analyze_batch(self):
+        """Test batched agent analysis matches analyzing each pair alone."""
+        references = ["ATGCATGCAT" * 30, "GGGGCCCCAA" * 30]
+        samples = ["ATGCTTGCAT" * 30, "GGGGCCCCAA" * 30]
+        ref_matrix = np.array([encode_sequence(r) for r in references])
+        sample_matrix = np.array([encode_sequence(s) for s in samples])
+        
+        mismatches = BatchMismatches.from_matrices(ref_matrix, sample_matrix)
+        self.assertEqual(mismatches.bounds, [0, 30, 30])
+        
+        for agent_type in (SequenceAlignmentAgent, MutationDetectionAgent):
+            batch = agent_type().analyze_batch(ref_matrix, sample_matrix, ['P1', 'P2'])
+            single = [agent_type().analyze({'patient_id': pid, 'reference': r, 'sample': s})
+                      for pid, r, s in zip(['P1', 'P2'], references, samples)]
+            self.assertEqual(batch, single)
+            shared = agent_type().analyze_batch(ref_matrix, sample_matrix, ['P1', 'P2'],
+                                                mismatches=mismatches)
+            self.assertEqual(shared, single)
+        
+        with self.assertRaises(ValueError):
+            MutationDetectionAgent().analyze_batch(ref_matrix, sample_matrix[:, :-1])
+    
     def test_mutation_agent(self):
         """Test mutation detection agent."""
         agent = MutationDetectionAgent()
@@ -86,7 +251,92 @@ class TestAgents(unittest.TestCase):
         self.assertIn('mutation_rate', result)
         self.assertIn('clinical_significance', result)
         self.assertEqual(result['total_mutations'], 1)
+        self.assertEqual(result['mutation_types']['transversions'], 1)
+    
+    def test_logged_results(self):
+        """Test results are stored as records and returned as dictionaries."""
+        agent = MutationDetectionAgent()
+        result = agent.analyze(self.patient_data)
+        
+        self.assertIsInstance(agent._results[0], tuple)
+        self.assertEqual(agent.get_results(), [result])
+        self.assertEqual(agent.results[0]['patient_id'], 'TEST_001')
+        self.assertEqual(agent.summarize()['results'], [result])
+        
+        # Dicts that don't match the record fields are kept unchanged
+        annotated = dict(result, reviewed=True)
+        agent.log_result(annotated)
+        agent.log_result({'patient_id': 'TEST_002'})
+        self.assertEqual(agent.get_results(), [result, annotated, {'patient_id': 'TEST_002'}])
+        self.assertEqual(agent.summarize()['total_analyses'], 3)
+    
+    def test_shared_encoding(self):
+        """Test agents reuse the encoding stored on the patient dict."""
+        agent = MutationDetectionAgent()
+        agent.analyze(self.patient_data)
+        
+        self.assertIn('_sample_u8', self.patient_data)
+        self.assertEqual(self.patient_data['_sample_u8'].tobytes(), self.sample.encode())
+        encoded = self.patient_data['_reference_u8']
+        agent.analyze(self.patient_data)
+        self.assertIs(self.patient_data['_reference_u8'], encoded)
+    
+    def test_precomputed_features(self):
+        """Test agents give the same results with precomputed sample features."""
+        sample = "GGCGCATATAAATTT" * 10
+        reference = "GGCGCATTTAAATTT" * 10
+        features = SequenceFeatures.from_sequence(sample)
+        
+        self.assertEqual(features.gc_content, calculate_gc_content(sample))
+        self.assertEqual(features.buf_u8.tobytes(), sample.encode())
+        
+        agents = (SequenceAlignmentAgent(), MutationDetectionAgent())
+        for agent in agents:
+            plain = agent.analyze({'reference': reference, 'sample': sample})
+            shared = agent.analyze({'reference': reference, 'sample': sample, '_features': features})
+            self.assertEqual(repr(shared), repr(plain))
+        
+        agent = PatternRecognitionAgent()
+        plain = agent.analyze({'sequence': sample})
+        shared = agent.analyze({'sequence': sample, '_features': features})
+        self.assertEqual(shared, plain)
+    
+    def test_mutation_categories(self):
+        """Test transition/transversion categorization."""
+        agent = MutationDetectionAgent()
+        result = agent.analyze({'reference': 'AGCTAC', 'sample': 'GATCTG'})
+        
+        self.assertEqual(result['mutation_types'], {
+            'transitions': 4,
+            'transversions': 2,
+            'total_substitutions': 6
+        })
     
+    def test_classify_risk_batch(self):
+        """Test batched risk classification matches per-result classification."""
+        agent = MutationDetectionAgent(significance_threshold=2)
+        samples = [self.reference, self.sample, "ATGCATGGATGGATGC", "TTGCATGGATGGATGG"]
+        for sample in samples:
+            agent.analyze({'reference': self.reference, 'sample': sample})
+        results = agent.get_results()
+        
+        self.assertEqual([r['clinical_significance'] for r in results],
+                         ['normal', 'low', 'moderate', 'high'])
+        self.assertEqual(agent.classify_risk_batch(pd.DataFrame(results)).tolist(),
+                         [agent.classify_risk(r) for r in results])
+
+    def test_significance_bands(self):
+        """Test significance bands for small and zero thresholds."""
+        expected = {
+            0: ['normal', 'high', 'high', 'high', 'high'],
+            1: ['normal', 'moderate', 'high', 'high', 'high'],
+            2: ['normal', 'low', 'moderate', 'moderate', 'high'],
+        }
+        for threshold, labels in expected.items():
+            with self.subTest(threshold=threshold):
+                agent = MutationDetectionAgent(significance_threshold=threshold)
+                self.assertEqual([agent._assess_significance(n) for n in range(5)], labels)
+
     def test_pattern_agent(self):
         """Test pattern recognition agent."""
         agent = PatternRecognitionAgent()
@@ -99,6 +349,51 @@ class TestAgents(unittest.TestCase):
         self.assertIn('complexity_score', result)
         self.assertIn('sequence_length', result)
         self.assertEqual(result['sequence_length'], len(self.reference))
+    
+    def test_pattern_agent_repeats(self):
+        """Test tandem and repeating pattern detection."""
+        agent = PatternRecognitionAgent()
+        result = agent.analyze({'patient_id': 'TEST_001', 'sequence': 'TT' + 'CAG' * 4 + 'TT'})
+        
+        cag_repeats = [r for r in result['tandem_repeats'] if r['unit'] == 'CAG']
+        self.assertEqual(len(cag_repeats), 1)
+        self.assertEqual(cag_repeats[0]['position'], 2)
+        self.assertEqual(cag_repeats[0]['repeat_count'], 4)
+        
+        top = result['repeating_patterns'][0]
+        self.assertEqual(top['frequency'], 4)
+        self.assertEqual(top['positions'], [2, 5, 8, 11])
+
+    def test_pattern_agent_lowercase_repeats(self):
+        """Test that lowercase sequences report the same repeating patterns."""
+        agent = PatternRecognitionAgent()
+        upper = agent._find_repeating_patterns(self.reference)
+        lower = agent._find_repeating_patterns(self.reference.lower())
+
+        self.assertTrue(upper)
+        self.assertEqual(lower, [dict(r, pattern=r['pattern'].lower()) for r in upper])
+        
+        # Soft-masked bases are not folded: CGT, cgT and CGt are different patterns
+        self.assertEqual(agent._find_repeating_patterns('ACGTTacgTTACGttCCAAGG'), [])
+        self.assertIn({'pattern': 'ACGN', 'length': 4, 'frequency': 3, 'positions': [0, 4, 8]},
+                      agent._find_repeating_patterns('ACGNACGNACGN'))
+
+    def test_pattern_agent_complexity_non_acgt(self):
+        """Test complexity of lowercase and ambiguous sequences matches the utility."""
+        agent = PatternRecognitionAgent()
+        for sequence in ("acgtacgtNNacgtTTGCAgg", "ACGTNACGTRYACGT", self.reference):
+            with self.subTest(sequence=sequence):
+                result = agent.analyze({'patient_id': 'TEST_001', 'sequence': sequence})
+                self.assertAlmostEqual(result['complexity_score'],
+                                       calculate_sequence_complexity(sequence))
+        self.assertGreater(agent.analyze({'sequence': 'acgtgcatta' * 3})['complexity_score'], 0)
+
+    def test_pattern_agent_known_motifs(self):
+        """Test known motif search."""
+        agent = PatternRecognitionAgent()
+        motifs = agent._find_known_motifs('GCTATAAATATAAAGGGCGGC')
+        
+        self.assertEqual(motifs, {'TATA_box': [2, 8], 'GC_box': [14]})
 
 
 class TestDataGenerator(unittest.TestCase):
@@ -120,16 +415,158 @@ class TestDataGenerator(unittest.TestCase):
         
         self.assertEqual(len(mutated), len(original))
         self.assertGreater(len(mutations), 0)
-    
+
+    def test_mutation_non_acgt_bases(self):
+        """Test ambiguous and lowercase bases mutate to valid nucleotides."""
+        generator = SyntheticGeneDataGenerator(seed=42)
+        original = "NNNNacgtACGT"
+        mutated, mutations = generator.introduce_mutation(original, mutation_rate=1.0)
+
+        self.assertEqual(len(mutations), len(original))
+        self.assertTrue(all(c in 'ATGC' for c in mutated))
+        for mutation in mutations:
+            self.assertIn(mutation['mutated'], 'ATGC')
+            self.assertNotEqual(mutation['mutated'], mutation['original'])
+
     def test_dataset_generation(self):
         """Test full dataset generation."""
         generator = SyntheticGeneDataGenerator(seed=42)
         dataset = generator.generate_gene_dataset(num_samples=10, sequence_length=100)
         
-        self.assertGreater(len(dataset), 0)
+        self.assertEqual(len(dataset), 10)
         self.assertIn('patient_id', dataset.columns)
         self.assertIn('gene_type', dataset.columns)
-        self.assertIn('sequence', dataset.columns)
+        self.assertIn('reference_sequence', dataset.columns)
+        self.assertIn('sample_sequence', dataset.columns)
+        
+        unmutated = dataset[~dataset['is_mutated']]
+        self.assertTrue((unmutated['sample_sequence'] == unmutated['reference_sequence']).all())
+
+
+
+class TestOrchestrator(unittest.TestCase):
+    """Test dataset-level orchestration."""
+    
+    def test_parallel_matches_serial(self):
+        """Test that worker processes produce the same results as a serial run."""
+        generator = SyntheticGeneDataGenerator(seed=7)
+        dataset = generator.generate_gene_dataset(num_samples=12, sequence_length=300)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'dataset.parquet')
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.save_dataset(dataset, path)
+                
+                serial = GeneSequencingOrchestrator()
+                serial_results = serial.analyze_dataset(path, max_workers=1)
+                parallel = GeneSequencingOrchestrator()
+                parallel_results = parallel.analyze_dataset(path, max_workers=2)
+        
+        self.assertEqual(repr(parallel_results), repr(serial_results))
+        self.assertEqual(len(parallel.analysis_results), len(serial_results))
+        self.assertEqual(parallel._risk_counts, serial._risk_counts)
+        self.assertEqual(sum(serial._risk_counts.values()), len(serial_results))
+        self.assertEqual(parallel.mutation_agent.get_results(), serial.mutation_agent.get_results())
+
+    def test_parallel_uses_configured_agents(self):
+        """Test that worker processes run the parent's agent configuration."""
+        generator = SyntheticGeneDataGenerator(seed=7)
+        dataset = generator.generate_gene_dataset(num_samples=6, sequence_length=300)
+
+        def configured():
+            orchestrator = GeneSequencingOrchestrator()
+            orchestrator.mutation_agent = MutationDetectionAgent(significance_threshold=100)
+            orchestrator.pattern_agent.known_motifs = {'ATG': 'ATG'}
+            return orchestrator
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'dataset.parquet')
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.save_dataset(dataset, path)
+            serial_results = configured().analyze_dataset(path, max_workers=1)
+            parallel = configured()
+            parallel_results = parallel.analyze_dataset(path, max_workers=2)
+
+        self.assertEqual(repr(parallel_results), repr(serial_results))
+        for patient in parallel_results:
+            self.assertEqual(list(patient['analyses']['pattern']['known_motifs']), ['ATG'])
+        self.assertEqual(len(parallel.mutation_agent.get_results()), len(parallel_results))
+
+    def test_batched_dataset(self):
+        """Test the matrix-based dataset path matches per-patient analysis."""
+        generator = SyntheticGeneDataGenerator(seed=13)
+        dataset = generator.generate_gene_dataset(num_samples=6, sequence_length=250)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, 'dataset.parquet')
+            with contextlib.redirect_stdout(io.StringIO()):
+                generator.save_dataset(dataset, path)
+            
+            serial = GeneSequencingOrchestrator()
+            serial_results = serial.analyze_dataset(path, max_workers=1)
+            batched = GeneSequencingOrchestrator()
+            batched_results = batched.analyze_dataset_batched(path)
+        
+        self.assertEqual(repr(batched_results), repr(serial_results))
+        self.assertEqual(batched._risk_counts, serial._risk_counts)
+        self.assertEqual(batched.alignment_agent.get_results(), serial.alignment_agent.get_results())
+    
+    def test_csv_matches_parquet(self):
+        """Test both dataset formats load into the same analyses."""
+        generator = SyntheticGeneDataGenerator(seed=11)
+        dataset = generator.generate_gene_dataset(num_samples=4, sequence_length=200)
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            results = []
+            for name in ('dataset.parquet', 'dataset.csv'):
+                path = os.path.join(tmpdir, name)
+                with contextlib.redirect_stdout(io.StringIO()):
+                    generator.save_dataset(dataset, path)
+                results.append(GeneSequencingOrchestrator().analyze_dataset(path, max_workers=1))
+        
+        self.assertEqual(len(results[0]), 4)
+        self.assertEqual(repr(results[1]), repr(results[0]))
+    
+    def test_patient_logging(self):
+        """Test per-patient summaries are logged at INFO only when verbose."""
+        patient_data = {
+            'patient_id': 'TEST_001',
+            'reference': 'ATGCGATCGA' * 20,
+            'sample': 'ATGCGTTCGA' * 20
+        }
+        
+        with self.assertLogs('orchestrator', level='INFO') as logs:
+            GeneSequencingOrchestrator(verbose=True).analyze_patient(dict(patient_data))
+        self.assertIn('Analyzing patient: TEST_001', logs.output[0])
+        
+        with self.assertLogs('orchestrator', level='DEBUG') as logs:
+            GeneSequencingOrchestrator().analyze_patient(dict(patient_data))
+        self.assertEqual(logs.records[0].levelname, 'DEBUG')
+    
+    def test_generate_report(self):
+        """Test that indented and compact reports hold the same JSON."""
+        orchestrator = GeneSequencingOrchestrator()
+        with contextlib.redirect_stdout(io.StringIO()):
+            orchestrator.analyze_patient({
+                'patient_id': 'TEST_001',
+                'reference': 'ATGCGATCGA' * 20,
+                'sample': 'ATGCGTTCGA' * 20
+            })
+            
+            with tempfile.TemporaryDirectory() as tmpdir:
+                indented_path = os.path.join(tmpdir, 'report.json')
+                compact_path = os.path.join(tmpdir, 'report_compact.json')
+                report = orchestrator.generate_report(indented_path)
+                orchestrator.generate_report(compact_path, compact=True)
+                
+                with open(indented_path) as f:
+                    indented = json.load(f)
+                with open(compact_path) as f:
+                    compact = json.load(f)
+        
+        self.assertEqual(indented, compact)
+        self.assertEqual(indented['summary'], report['summary'])
+        self.assertEqual(indented['total_patients_analyzed'], 1)
 
 
 if __name__ == '__main__':